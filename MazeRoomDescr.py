@@ -1,11 +1,8 @@
 import random
-import numpy as np
-import matplotlib.pyplot as plt
-from collections import deque
 import re
-
-def set_rooms_seed(seed):
-    random.seed(seed)
+import string
+from paths import carve_passages
+from cache import LRUCache
 
 # Constants
 WALL = '#'
@@ -27,6 +24,10 @@ ROOM_TYPES = {
     "Magic Chamber": {"symbol": "C", "color": "Purple", "rgb": (138, 43, 226)}
 }
 
+# Room type ids are positions in ROOM_TYPES, looked up from a color in one step
+ROOM_TYPE_NAMES = tuple(ROOM_TYPES)
+ROOM_TYPE_BY_RGB = {info['rgb']: i for i, info in enumerate(ROOM_TYPES.values())}
+
 #used to check adjectives for proper grammar
 VOWELS = {'a', 'e', 'i', 'o', 'u'}
 
@@ -55,118 +56,148 @@ COLOR_ICONS = {
     "Blue": "🟦", "Purple": "🟪", "Cyan": "🟦"
 }
 
-#Shuffle deques for randomness
-def shuffled_deque(items):
-    random.shuffle(items)
-    return deque(items)
+#componets of description sentences (50+ each)
+ADJECTIVES = (
+    "red", "orange", "yellow", "green", "blue", "indigo", "violet", "scarlet", "golden", "silver", "dingy", "furry", "iridescent", "bloody", "dangerous",
+    "dimly lit", "ancient", "dusty", "ornate", "mystical", "shimmering", "overgrown", "crumbling", "icy", "cursed", "sinister", "clean", "botanical", "windowless",
+    "hot", "colossal", "glamorous", "plain", "unkempt", "dazzling", "repulsive", "small", "tall", "lethal", "damp", "ancient", "broad", "glistening", "colorful",
+    "fabulous", "sparkly", "peaceful", "ugly", "bright", "odd", "narrow", "jagged", "magical", "majestic", "dreary", "snowy", "suspicious", "fluffy", "monochromatic",
+    "tense", "sad", "windy", "pristine", "rancid", "enchanting", "filthy", "glorious", "flat", "decayed", "disgusting", "pretty", "beautiful", "furry", "frigid",
+    "murky", "gloomy", "eerie", "smoky", "glistening", "sacred", "foul-smelling", "charred", "echoing", "ominous", "extraordinary", "outstanding", "spikey", "gory"
+)
+
+FEATURES = (
+    "runes", "artifacts", "statues", "faint glows", "whispers", "cobwebs", "skeletons", "strange symbols", "globes", "invisible items", "colorful potions", "clown masks", "trap doors", "large piles of books", "pirahna tanks", "toe nail clippings",
+    "glowing crystals", "rotting books", "twisting vines", "cracked mirrors", "floating candles", "silver chalices", "sleeping animals", "jars of organs", "bamboo fans", "tall flowers", "unlabeled beakers", "swimming koi fish",
+    "stone tablets", "gargoyle carvings", "bloodstains", "piles of bones", "enchanted tomes", "golden relics", "broken robots", "dismembered limbs", "music boxes", "frozen cryptids", "shadow figures", "blank books", "skeletons of various beings",
+    "iron chains", "ancient writings", "piles of gold", "cursed paintings", "shattered glass", "mouse traps", "faded sketches", "royal clothing", "delicious food", "surgical equipment", "shark tanks", "floating goldfish",
+    "twisted roots", "burning torches", "glowing fungi", "dark portals", "rusted weapons", "torn banners", "coffins", "buttons", "bloodthirsty leeches", "mysterious powder", "funhouse mirrors", "empty pictureframes", "static tvs", "bubbles",
+    "scattered scrolls", "moonlit inscriptions", "arcane sigils", "hollow statues", "withered vines", "old maps", "oil paintings", "shifty eyeballs", "fungi", "colorful mushrooms", "meat hooks", "security cameras", "snake pits", "floating "
+    "luminescent glyphs", "hidden doors", "skulls", "haunted dolls", "floating feathers", "corroded shields", "portraits", "mysterious fluids", "funny photos", "enchanted rings", "hand grenades", "taxidermied animals", "bricked-up windows",
+    "blackened cauldrons", "jade ornaments", "phantom imprints", "strange artifacts", "shadowy figures", "mystic orbs", "tall pillars", "magical scrolls", "sleepy familiars", "radioactive signs", "plush animals", "crime scene tape"
+)
+
+SOUNDS = (
+    "a distant echo", "a low hum", "mysterious whispers", "a crackling fire", "dripping water",
+    "a soft rustling", "a deep growl", "chanting voices", "faint music", "a sharp screech",
+    "rattling chains", "an eerie silence", "a sudden gust of wind", "soft laughter", "a heartbeat-like thumping",
+    "footsteps in the distance", "a hollow whisper", "a loud bang", "crackling static", "soft breathing",
+    "a deep moan", "a spectral howl", "clinking metal", "soft scratching", "an otherworldly chime",
+    "a pulsating vibration", "a distant explosion", "a metallic ringing", "a guttural growl", "a distant scream",
+    "a single dripping noise", "a faint ticking", "muffled voices", "a sudden crash", "grinding stone",
+    "a beastly snarl", "scraping wood", "a soft thud", "a chorus of whispers", "gasping breaths",
+    "a ghostly moan", "drumming fingers", "a rhythmic tapping", "a low drone", "a mystical chime",
+    "a gust of wind through cracks", "fluttering wings", "scratching from behind the walls", "a hollow knock", "echoing footsteps", "Jumanji Drums"
+)
+
+ACTIONS = (
+    "inviting you in", "sending chills down your spine", "filling the air with unease", "making you feel watched",
+    "urging you to move forward", "making the air feel heavy", "bringing a sense of nostalgia", "whispering unintelligible secrets",
+    "creating an eerie tension", "pulling you toward the center", "giving an overwhelming feeling of dread", "making the walls seem alive",
+    "distorting the space around you", "tempting you to explore", "pushing you back with an unseen force", "draining the warmth from your body",
+    "making your skin tingle", "causing your vision to blur", "making it hard to breathe", "surrounding you with an unseen presence",
+    "making your heartbeat race", "clouding your mind", "provoking an unexplained sorrow", "making the floor feel unstable",
+    "enveloping you in a strange warmth", "mimicking voices you recognize", "making the air hum with energy", "repeating your footsteps behind you",
+    "causing the light to flicker", "making shadows move on their own", "giving off a magnetic pull", "causing a strange ringing in your ears",
+    "making time seem to slow down", "erasing the sound of your footsteps", "intensifying your fear", "pressing a weight upon your shoulders",
+    "giving you the sensation of falling", "sending a tingling sensation through your body", "making it feel like you are being followed",
+    "stirring up old memories", "causing an inexplicable chill", "making you feel both welcomed and threatened", "casting flickering shadows on the walls",
+    "leaving a metallic taste in your mouth", "causing your surroundings to vibrate slightly", "creating a forceful energy in the room",
+    "tricking your mind into hearing distant voices", "making the ground feel uneven", "making you feel strangely at peace",
+    "giving the sense that something is hiding nearby", "making you feel lost in time"
+)
+
+#descriptions sentences (21)
+SENTENCE_STRUCTURES = (
+    "You go into a {adjective} chamber. {feature} line the walls, while {sound} fills the air, {action}.",
+    "This {adjective} hall is filled with {feature}. The sound of {sound} echoes around you, {action}.",
+    "A {adjective} passage stretches before you, adorned with {feature}. The air is thick with {sound}, {action}.",
+    "You find yourself in a {adjective} room where {feature} stand ominously. {sound} can be heard, {action}.",
+    "An unsettling, {adjective} aura lingers in the air. {feature} surround the room, while {sound} fills the silence, {action}.",
+    "As you enter the {adjective} room, {feature} cast eerie shadows along the walls. The presence of {sound} is overwhelming, {action}.",
+    "The {adjective} corridor twists ahead, lined with {feature}. A faint echo of {sound} follows you, {action}.",
+    "A {adjective} archway looms before you, leading into a space filled with {feature}. In the distance, {sound} resonates, {action}.",
+    "The {adjective} chamber hums with energy. {feature} flicker in the dim light as {sound} reverberates through the space, {action}.",
+    "You cautiously walk into a {adjective} vault. The floor is littered with {feature}, while {sound} slowly disappears in the distance, {action}.",
+    "A {adjective} energy is in the air. {feature} surround the room, while {sound} echos in the distance, {action}.",
+    "You quickly step into a {adjective} room. The floor is covered with {feature}, while {sound} grows louder, {action}.",
+    "You stumble into a {adjective} room. It contains numerous {feature}, while {sound} follow closely behind you, {action}.",
+    "This {adjective} area is hoarded with {feature}. The sound of {sound} stop as you enter, {action}.",
+    "You fall into a {adjective} room. It is filled with numerous {feature}, you no longer hear {sound}, {action}.",
+    "You hear the sound of {sound} chasing closely behind you. You escape into a {adjective} room containing {feature}, {action}.",
+    "As you enter, you see {feature} inside this {adjective} space, {action}. {sound} soften the longer you are in here.",
+    "As you walk in, you see {feature} inside this {adjective} area, {action}. {sound} start playing.",
+    "As you enter the {adjective} space, you notice {feature}, {action}. {sound} grow louder the longer you are in here.",
+    "You follow the sound of {sound} and discover a {adjective} area. It is occupied with {feature}, {action}.",
+    "You cautiously walk through the door into a {adjective} room. It is packed with {feature}. In the corner, a speaker is playing {sound}, {action}.",
+)
+
+VOCABULARIES = {
+    'adjective': ADJECTIVES,
+    'feature': FEATURES,
+    'sound': SOUNDS,
+    'action': ACTIONS,
+}
 
-def generate_room_description():
-    """ Generates unique room descriptions by cycling elements and reshuffling periodically."""
-    
-    #NOTE: moved sentence components into function to obey set seed when shuffled_deque is called.
-    #componets of description sentences (50+ each)
-    ADJECTIVES = shuffled_deque([
-        "red", "orange", "yellow", "green", "blue", "indigo", "violet", "scarlet", "golden", "silver", "dingy", "furry", "iridescent", "bloody", "dangerous",
-        "dimly lit", "ancient", "dusty", "ornate", "mystical", "shimmering", "overgrown", "crumbling", "icy", "cursed", "sinister", "clean", "botanical", "windowless",
-        "hot", "colossal", "glamorous", "plain", "unkempt", "dazzling", "repulsive", "small", "tall", "lethal", "damp", "ancient", "broad", "glistening", "colorful",
-        "fabulous", "sparkly", "peaceful", "ugly", "bright", "odd", "narrow", "jagged", "magical", "majestic", "dreary", "snowy", "suspicious", "fluffy", "monochromatic",
-        "tense", "sad", "windy", "pristine", "rancid", "enchanting", "filthy", "glorious", "flat", "decayed", "disgusting", "pretty", "beautiful", "furry", "frigid",
-        "murky", "gloomy", "eerie", "smoky", "glistening", "sacred", "foul-smelling", "charred", "echoing", "ominous", "extraordinary", "outstanding", "spikey", "gory"
-    ])
-
-    FEATURES = shuffled_deque([
-        "runes", "artifacts", "statues", "faint glows", "whispers", "cobwebs", "skeletons", "strange symbols", "globes", "invisible items", "colorful potions", "clown masks", "trap doors", "large piles of books", "pirahna tanks", "toe nail clippings",
-        "glowing crystals", "rotting books", "twisting vines", "cracked mirrors", "floating candles", "silver chalices", "sleeping animals", "jars of organs", "bamboo fans", "tall flowers", "unlabeled beakers", "swimming koi fish",
-        "stone tablets", "gargoyle carvings", "bloodstains", "piles of bones", "enchanted tomes", "golden relics", "broken robots", "dismembered limbs", "music boxes", "frozen cryptids", "shadow figures", "blank books", "skeletons of various beings",
-        "iron chains", "ancient writings", "piles of gold", "cursed paintings", "shattered glass", "mouse traps", "faded sketches", "royal clothing", "delicious food", "surgical equipment", "shark tanks", "floating goldfish",
-        "twisted roots", "burning torches", "glowing fungi", "dark portals", "rusted weapons", "torn banners", "coffins", "buttons", "bloodthirsty leeches", "mysterious powder", "funhouse mirrors", "empty pictureframes", "static tvs", "bubbles",
-        "scattered scrolls", "moonlit inscriptions", "arcane sigils", "hollow statues", "withered vines", "old maps", "oil paintings", "shifty eyeballs", "fungi", "colorful mushrooms", "meat hooks", "security cameras", "snake pits", "floating "
-        "luminescent glyphs", "hidden doors", "skulls", "haunted dolls", "floating feathers", "corroded shields", "portraits", "mysterious fluids", "funny photos", "enchanted rings", "hand grenades", "taxidermied animals", "bricked-up windows",
-        "blackened cauldrons", "jade ornaments", "phantom imprints", "strange artifacts", "shadowy figures", "mystic orbs", "tall pillars", "magical scrolls", "sleepy familiars", "radioactive signs", "plush animals", "crime scene tape"
-    ])
-
-    SOUNDS = shuffled_deque([
-        "a distant echo", "a low hum", "mysterious whispers", "a crackling fire", "dripping water",
-        "a soft rustling", "a deep growl", "chanting voices", "faint music", "a sharp screech",
-        "rattling chains", "an eerie silence", "a sudden gust of wind", "soft laughter", "a heartbeat-like thumping",
-        "footsteps in the distance", "a hollow whisper", "a loud bang", "crackling static", "soft breathing",
-        "a deep moan", "a spectral howl", "clinking metal", "soft scratching", "an otherworldly chime",
-        "a pulsating vibration", "a distant explosion", "a metallic ringing", "a guttural growl", "a distant scream",
-        "a single dripping noise", "a faint ticking", "muffled voices", "a sudden crash", "grinding stone",
-        "a beastly snarl", "scraping wood", "a soft thud", "a chorus of whispers", "gasping breaths",
-        "a ghostly moan", "drumming fingers", "a rhythmic tapping", "a low drone", "a mystical chime",
-        "a gust of wind through cracks", "fluttering wings", "scratching from behind the walls", "a hollow knock", "echoing footsteps", "Jumanji Drums"
-    ])
-
-    ACTIONS = shuffled_deque([
-        "inviting you in", "sending chills down your spine", "filling the air with unease", "making you feel watched",
-        "urging you to move forward", "making the air feel heavy", "bringing a sense of nostalgia", "whispering unintelligible secrets",
-        "creating an eerie tension", "pulling you toward the center", "giving an overwhelming feeling of dread", "making the walls seem alive",
-        "distorting the space around you", "tempting you to explore", "pushing you back with an unseen force", "draining the warmth from your body",
-        "making your skin tingle", "causing your vision to blur", "making it hard to breathe", "surrounding you with an unseen presence",
-        "making your heartbeat race", "clouding your mind", "provoking an unexplained sorrow", "making the floor feel unstable",
-        "enveloping you in a strange warmth", "mimicking voices you recognize", "making the air hum with energy", "repeating your footsteps behind you",
-        "causing the light to flicker", "making shadows move on their own", "giving off a magnetic pull", "causing a strange ringing in your ears",
-        "making time seem to slow down", "erasing the sound of your footsteps", "intensifying your fear", "pressing a weight upon your shoulders",
-        "giving you the sensation of falling", "sending a tingling sensation through your body", "making it feel like you are being followed",
-        "stirring up old memories", "causing an inexplicable chill", "making you feel both welcomed and threatened", "casting flickering shadows on the walls",
-        "leaving a metallic taste in your mouth", "causing your surroundings to vibrate slightly", "creating a forceful energy in the room",
-        "tricking your mind into hearing distant voices", "making the ground feel uneven", "making you feel strangely at peace",
-        "giving the sense that something is hiding nearby", "making you feel lost in time"
-    ])
-
-    #descriptions sentences (21)
-    SENTENCE_STRUCTURES = shuffled_deque([
-        "You go into a {adjective} chamber. {feature} line the walls, while {sound} fills the air, {action}.",
-        "This {adjective} hall is filled with {feature}. The sound of {sound} echoes around you, {action}.",
-        "A {adjective} passage stretches before you, adorned with {feature}. The air is thick with {sound}, {action}.",
-        "You find yourself in a {adjective} room where {feature} stand ominously. {sound} can be heard, {action}.",
-        "An unsettling, {adjective} aura lingers in the air. {feature} surround the room, while {sound} fills the silence, {action}.",
-        "As you enter the {adjective} room, {feature} cast eerie shadows along the walls. The presence of {sound} is overwhelming, {action}.",
-        "The {adjective} corridor twists ahead, lined with {feature}. A faint echo of {sound} follows you, {action}.",
-        "A {adjective} archway looms before you, leading into a space filled with {feature}. In the distance, {sound} resonates, {action}.",
-        "The {adjective} chamber hums with energy. {feature} flicker in the dim light as {sound} reverberates through the space, {action}.",
-        "You cautiously walk into a {adjective} vault. The floor is littered with {feature}, while {sound} slowly disappears in the distance, {action}.",
-        "A {adjective} energy is in the air. {feature} surround the room, while {sound} echos in the distance, {action}.",
-        "You quickly step into a {adjective} room. The floor is covered with {feature}, while {sound} grows louder, {action}.",
-        "You stumble into a {adjective} room. It contains numerous {feature}, while {sound} follow closely behind you, {action}.",
-        "This {adjective} area is hoarded with {feature}. The sound of {sound} stop as you enter, {action}.",
-        "You fall into a {adjective} room. It is filled with numerous {feature}, you no longer hear {sound}, {action}.",
-        "You hear the sound of {sound} chasing closely behind you. You escape into a {adjective} room containing {feature}, {action}.",
-        "As you enter, you see {feature} inside this {adjective} space, {action}. {sound} soften the longer you are in here.",
-        "As you walk in, you see {feature} inside this {adjective} area, {action}. {sound} start playing.",
-        "As you enter the {adjective} space, you notice {feature}, {action}. {sound} grow louder the longer you are in here.",
-        "You follow the sound of {sound} and discover a {adjective} area. It is occupied with {feature}, {action}.",
-        "You cautiously walk through the door into a {adjective} room. It is packed with {feature}. In the corner, a speaker is playing {sound}, {action}.",
-    ])
-    if len(ACTIONS) < 3:
-        random.shuffle(ACTIONS)
-    if len(SOUNDS) < 3:
-        random.shuffle(SOUNDS)
-
-    structure = SENTENCE_STRUCTURES.popleft()
-    SENTENCE_STRUCTURES.append(structure)
-
-    action = ACTIONS.popleft()
-    sound = SOUNDS.popleft()
-    feature = FEATURES.popleft()
-    adjective = ADJECTIVES.popleft()
-
-    ACTIONS.append(action)
-    SOUNDS.append(sound)
-    FEATURES.append(feature)
-    ADJECTIVES.append(adjective)
-
-    description = structure.format(
-        adjective=adjective,
-        feature=feature,
-        sound=sound,
-        action=action
-    )
-    # Ensures proper spacing and capitalization between sentences
-    description = re.sub(r"([.!?])\s*([a-z])", lambda m: f"{m.group(1)} {m.group(2).upper()}", description)
-    
-    return format_sentence(description)
+def word_forms(word):
+    """The four ways a word is written in a sentence, indexed by (starts the sentence) + 2*(follows an article)."""
+    article = ("an " if word[0].lower() in VOWELS else "a ") + word
+    return (word, word[0].upper() + word[1:], article, article[0].upper() + article[1:])
+
+# every word of every vocabulary in each of its forms, written out once
+WORD_FORMS = {name: list(zip(*(word_forms(word) for word in words))) for name, words in VOCABULARIES.items()}
+
+def compile_template(template):
+    """Splits a sentence template into its literal text and the word list each blank draws from.
+
+    The form of each blank (capitalized, after 'a'/'an') is worked out here, so filling the
+    template in is a join and needs no formatting afterwards."""
+    literals, blanks = [], []
+    text = ""
+    for literal, field, _, _ in string.Formatter().parse(template):
+        text += literal
+        if field is None:
+            continue
+        # the template's article is replaced by the one the drawn word needs
+        article = re.search(r"\b(a|an|A|An) $", text)
+        if article:
+            text = text[:article.start()]
+        starts_sentence = not text.strip() and not literals or text.rstrip().endswith(('.', '!', '?'))
+        literals.append(text)
+        blanks.append(WORD_FORMS[field][starts_sentence + 2*bool(article)])
+        text = ""
+    literals.append(text)
+    return tuple(literals), tuple(blanks)
+
+TEMPLATES = tuple(compile_template(structure) for structure in SENTENCE_STRUCTURES)
+
+def generate_room_descriptions(n, rng=random):
+    """Generates n room descriptions, drawing a sentence and one word per blank from rng for each."""
+    descriptions = []
+    for _ in range(n):
+        literals, blanks = TEMPLATES[rng.randrange(len(TEMPLATES))]
+        parts = [literals[0]]
+        for words, literal in zip(blanks, literals[1:]):
+            parts.append(words[rng.randrange(len(words))])
+            parts.append(literal)
+        descriptions.append("".join(parts))
+    return descriptions
+
+def generate_room_description(rng=random):
+    """Generates a single room description, drawing from rng."""
+    return generate_room_descriptions(1, rng)[0]
+
+# descriptions of rooms in mazes that have been looked at, shared by every view of the same maze
+description_cache = LRUCache(max_entries=4096, max_bytes=2**20)
+
+def describe_room(seed, index, room_type):
+    """The description of room number index, of type room_type, in the maze generated from seed.
+
+    It depends on nothing else, so every view, save and export of a maze reads the same text."""
+    def create():
+        # string seeds hash the same way in every process
+        return generate_room_description(random.Random(f"{seed}:{index}:{room_type}"))
+    return description_cache.get_or_create((seed, index, room_type), create, len)
 
 def generate_maze(width, height, room_count, seed=None):
     """Generate a maze with rooms and return the maze grid and descriptions."""
@@ -176,37 +207,29 @@ def generate_maze(width, height, room_count, seed=None):
     else:
         print(f"Using Provided Seed: {seed} - This will generate the same maze.")
 
-    random.seed(seed)
+    rng = random.Random(seed)
 
     maze = [[WALL for _ in range(width)] for _ in range(height)]
     room_grid = [[None for _ in range(width)] for _ in range(height)]
     desc_list = []
 
-    def carve_passages_from(x, y):
-        directions = [(0, 2), (2, 0), (0, -2), (-2, 0)]
-        random.shuffle(directions)
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-            if 0 < nx < width - 1 and 0 < ny < height - 1 and maze[ny][nx] == WALL:
-                maze[y + dy // 2][x + dx // 2] = PATH
-                maze[ny][nx] = PATH
-                carve_passages_from(nx, ny)
-
     maze[1][1] = START
     maze[0][1] = PATH
-    carve_passages_from(1, 1)
+    cells = [cell for row in maze for cell in row]
+    carve_passages(cells, width, height, 1, 1, rng, PATH, carvable=WALL)
+    maze = [cells[y*width:(y + 1)*width] for y in range(height)]
 
     maze[height - 3][width - 2] = EXIT
     maze[height - 3][width - 3] = PATH
 
     # Generate rooms
-    generate_rooms(maze, room_grid, room_count, desc_list)
+    generate_rooms(maze, room_grid, room_count, desc_list, rng)
     return maze, room_grid, desc_list, seed
 
-def generate_rooms(maze, room_grid, count, desc_list):
+def generate_rooms(maze, room_grid, count, desc_list, rng=random):
     """ Ensures all rooms are unique when count ≥7, allowing duplicates only after 10."""
     room_types = list(ROOM_TYPES.keys())
-    random.shuffle(room_types)
+    rng.shuffle(room_types)
 
     height, width = len(maze), len(maze[0])
 
@@ -218,11 +241,11 @@ def generate_rooms(maze, room_grid, count, desc_list):
 
     if count >= len(room_types):
         selected_rooms = room_types[:]  # Add all unique rooms first
-        selected_rooms += random.choices(room_types, k=count - len(room_types))  # Fill with duplicates if needed
+        selected_rooms += rng.choices(room_types, k=count - len(room_types))  # Fill with duplicates if needed
     elif count >= 7:
         selected_rooms = room_types[:count]  # Ensure every room type appears at least once b4 duplication
     else:
-        selected_rooms = random.choices(room_types, k=count)  # Allow random selection
+        selected_rooms = rng.choices(room_types, k=count)  # Allow random selection
 
     placed_rooms = 0  # Tracking the number of placed rooms
 
@@ -230,13 +253,13 @@ def generate_rooms(maze, room_grid, count, desc_list):
     for room_type in selected_rooms:
         attempts = 0
         while attempts < 100:  # Increasing attempts to maximize placements
-            x = random.randint(1, width - 2)
-            y = random.randint(1, height - 2)
+            x = rng.randint(1, width - 2)
+            y = rng.randint(1, height - 2)
 
             if is_valid_room(x, y):
                 room_grid[y][x] = room_type  # Ensures each room takes up only ONE square
                 maze[y][x] = room_type  # Makes sure the room appears in visualization
-                desc_list.append((ROOM_TYPES[room_type]['color'], room_type, generate_room_description()))  # ✅ Fix applied
+                desc_list.append((ROOM_TYPES[room_type]['color'], room_type, generate_room_description(rng)))  # ✅ Fix applied
                 placed_rooms += 1
                 break  # Move to the next room
             
@@ -247,6 +270,9 @@ def generate_rooms(maze, room_grid, count, desc_list):
 
 def display_maze(maze):
     """Display the maze using Matplotlib."""
+    # only loaded here, the server imports this module just for the room types and descriptions
+    import numpy as np
+    import matplotlib.pyplot as plt
     height, width = len(maze), len(maze[0])
     image = np.zeros((height, width, 3), dtype=np.uint8)
 
@@ -1,23 +1,24 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Flask, request, redirect, url_for, session, flash, jsonify, abort
 from flask_login import LoginManager, UserMixin, login_user, current_user, login_required, logout_user
 from flask_sqlalchemy import SQLAlchemy
 import math
 import string
 import random
+import hashlib
+import flask
 import grid
-import sqlite3
-import sys
-from MazeRoomDescr import ROOM_TYPES, generate_room_description, set_rooms_seed
-
-sys.setrecursionlimit(10000)
-
-connection = sqlite3.connect("Forgeon.db", check_same_thread=False)
-cursor = connection.cursor()
-
-cursor.execute(""" CREATE TABLE IF NOT EXISTS Maze (maze_id BIGINT, user varchar(255), name varchar(255),
-x INT, y INT, seed INT, args varchar(512)) """)
+import metrics
+import database
+import jobs
+import showcase
+import render
+from cache import LRUCache
+from MazeRoomDescr import ROOM_TYPES, description_cache
+from forge import generate_image, grab_map, parse_maze_args
+from metrics import timed
 
 app = Flask(__name__)
+database.init_app(app)
 
 secret_key = ''
 for i in range(255):
@@ -40,6 +41,11 @@ db.init_app(app)
 with app.app_context():
     db.create_all()
 
+def render_template(template_name, **context):
+    """flask.render_template, timed as its own stage"""
+    with timed('render_template'):
+        return flask.render_template(template_name, **context)
+
 @login_manager.user_loader
 def loader_user(user_id):
     return Users.query.get(user_id)
@@ -50,58 +56,149 @@ def get_username():
     else:
         return ""
 
-# For grid
-def generate_image(
-		x = 30, 
-		y = 30, 
-		seed = random.getrandbits(32), 
-		filter=sum([0 | (1 << i) for i in range(0, len(ROOM_TYPES.keys()))]), 
-		max_room_size=8, 
-		room_num=8
-	):
-    """Creates a Grid object using the inputs and generates rooms/paths onto the grid."""
-    sampleGrid = grid.Grid(x,y,seed)
-    sampleGrid.generateRooms(room_num, max_room_size=max_room_size, filter=filter)
-    sampleGrid.generatePath(1)
-    return sampleGrid
-    
-def grab_map(grid):
+# Largest width and height of a maze, those over TILED_SIZE are shown in the tile viewer instead of one image
+MAX_SIZE = 5000
+TILED_SIZE = 200
+
+def valid_seed(seed):
+    """Whether seed can be stored, by Grid.serialize and in the saved maze table"""
+    return type(seed) == int and 0 <= seed < grid.SEED_LIMIT
+
+@app.before_request
+def check_url_seed():
+    '''Answers 400 for a url whose <int:seed> is too large to be stored, before any route generates the maze'''
+    seed = (request.view_args or {}).get('seed')
+    if seed is not None and not valid_seed(seed):
+        abort(400)
+
+# Generated mazes are fully determined by (x, y, seed, args), so they are kept for reloads and shared links
+maze_cache = LRUCache(max_entries=256, max_bytes=256*2**20)
+# Tiles are cached apart from their maze, a viewer only asks for the few around what it shows
+tile_cache = LRUCache(max_entries=8192, max_bytes=64*2**20)
+
+def cache_maze(x, y, seed, args, sampleGrid):
     '''
-    Takes the Grid and gets the room descriptions/locations
-    Returns a list of [coordinates, roomName, description] pairs for each room
+    Renders a generated Grid and caches it under (x, y, seed, args)
+    Returns the {'grid', 'image', 'maze'} entry
     '''
-    set_rooms_seed(grid.seed)
-    maze_data = []    
-    for topleft, bottomright, color in grid.rooms:
-        for type_name, info in ROOM_TYPES.items():
-            if info['rgb'] == color:
-                # Get coordinates for the room
-                coords = grid.toImageLocation(topleft, bottomright)
-                maze_data.append([
-                    '{},{},{},{}'.format(*coords),
-                    type_name,
-                    f"{type_name}: {generate_room_description()}" # regenerates when you refresh page, intended?
-                ])
-                break    
-    return maze_data
+    return cache_entry((x, y, seed, args), {'grid': sampleGrid, 'image': sampleGrid.image(raw=True), 'maze': grab_map(sampleGrid)})
+
+def cache_entry(key, entry):
+    """Caches a {'grid', 'image', 'maze'} entry under its (x, y, seed, args) key and returns it"""
+    size = entry['grid'].cells.nbytes + len(entry['image']) + sum(len(desc) for _, _, desc in entry['maze'])
+    maze_cache.put(key, entry, size)
+    return entry
+
+def load_maze(x, y, seed, args=""):
+    '''
+    Returns the cached {'grid', 'image', 'maze'} entry for a maze, generating it on a miss
+    The args are expected to have been checked with parse_maze_args
+    '''
+    entry = maze_cache.get((x, y, seed, args))
+    if entry is None:
+        entry = cache_maze(x, y, seed, args, generate_image(x, y, seed, **parse_maze_args(x, y, args)))
+    return entry
+
+def finish_job(job):
+    """Caches the maze a background job built, so its page and png are served from the cache"""
+    cache_entry(job.key, {'grid': grid.Grid.deserialize(job.result['grid']), 'image': job.result['image'], 'maze': job.result['maze']})
+
+# Mazes with at least this many cells are built by the job queue instead of inside the request
+JOB_CELLS = 100*100
+# jobs are kept in the database, so every worker process of main.py sees the same ones
+job_queue = jobs.JobQueue(on_done=finish_job, table=database.JobTable())
+
+def queue_maze(x, y, seed, args=""):
+    '''
+    Hands a maze too large to build inside a request to the job queue, returning its Job
+    A maze another worker process has already built is cached from its job instead, returning None
+    '''
+    job = job_queue.submit(x, y, seed, args)
+    if job.stage == 'done':
+        finish_job(job)
+        return None
+    return job
+
+def maze_pending(x, y, seed, args=""):
+    '''
+    Whether a maze is too large to build inside a request and is not cached, handing it to the job queue if so
+    Callers answer with retry_later until it is built, only logged in users may have a maze queued
+    '''
+    if x*y < JOB_CELLS or (x, y, seed, args) in maze_cache:
+        return False
+    if not current_user.is_authenticated:
+        abort(401)
+    return queue_maze(x, y, seed, args) is not None
+
+def retry_later(response=None):
+    """Turns response, or an empty one, into a 503 asking the client to come back once a queued maze may be built"""
+    if response is None:
+        response = app.response_class()
+    response.status_code = 503
+    response.retry_after = 1
+    return response
+
+def image_url(x, y, seed, args=""):
+    """The url of a maze's png, served by maze_image"""
+    if args:
+        return url_for('maze_image', x=x, y=y, seed=seed, args=args)
+    return url_for('maze_image_default', x=x, y=y, seed=seed)
+
+def tile_root(x, y, seed, args=""):
+    """The url a maze's tiles are under, followed by z/tx/ty.png"""
+    if args:
+        url = url_for('maze_tile', x=x, y=y, seed=seed, args=args, z=0, tx=0, ty=0)
+    else:
+        url = url_for('maze_tile_default', x=x, y=y, seed=seed, z=0, tx=0, ty=0)
+    return url.rsplit('/', 3)[0] + '/'
+
+def tile_context(x, y, seed, args=""):
+    """What gridview.html needs to show a maze in the tile viewer, nothing for one small enough to show as a single image"""
+    if max(x, y) <= TILED_SIZE:
+        return {}
+    return dict(tile_root=tile_root(x, y, seed, args), tile_size=render.TILE_SIZE, tile_levels=render.tile_levels(x, y))
+
+def maze_page(x, y, seed, args=""):
+    '''
+    Renders gridview.html for a maze, the args are expected to have been checked with parse_maze_args
+    Large mazes that are not cached yet are handed to the job queue, the page then polls for them
+    '''
+    context = dict(username=get_username(), image_url=image_url(x, y, seed, args), x=x, y=y, seed=seed, args=args, room_types=list(ROOM_TYPES.keys()))
+    context.update(tile_context(x, y, seed, args))
+    if x*y >= JOB_CELLS and (x, y, seed, args) not in maze_cache:
+        job = queue_maze(x, y, seed, args)
+        if job is not None:
+            return render_template('gridview.html', job_id=job.id, maze=[], **context)
+    return render_template('gridview.html', job_id=None, maze=load_maze(x, y, seed, args)['maze'], **context)
+
+# Welcome page mazes are prebuilt, each request takes the next one so the page costs no generation
+# the pool is filled in the background from the first visit on, so importing app builds none of them
+SHOWCASE_SIZE = 30
+
+def showcase_maze(seed):
+    """Builds a welcome page maze, its png is then served from the maze cache"""
+    entry = load_maze(SHOWCASE_SIZE, SHOWCASE_SIZE, seed)
+    return {'seed': seed, 'maze': entry['maze'], 'text': entry['grid'].displayGrid("Text")}
+
+showcase_pool = showcase.ShowcasePool(showcase_maze)
 
 @app.route('/')
 def welcome_page():
-    sampleGrid = generate_image()
+    entry = showcase_pool.take()
     # Check if the user is already authenticated
     if current_user.is_authenticated:
         # Redirect to the main page if logged in
         return render_template('home.html', 
 		        username=get_username(), 
-		        image=sampleGrid.displayGrid(),
-		        maze=grab_map(sampleGrid),
+		        image_url=image_url(SHOWCASE_SIZE, SHOWCASE_SIZE, entry['seed']),
+		        maze=entry['maze'],
                 room_types=(list(ROOM_TYPES.keys()))
 		    )
     return render_template('index.html', 
         username=get_username(), 
-        image=sampleGrid.displayGrid(), 
-        text=sampleGrid.displayGrid("Text"),
-        maze=grab_map(sampleGrid)
+        image_url=image_url(SHOWCASE_SIZE, SHOWCASE_SIZE, entry['seed']), 
+        text=entry['text'],
+        maze=entry['maze']
         )
 
 @app.route('/logout')
@@ -172,55 +269,162 @@ def randomize_maze():
     room_filter = random.getrandbits(len(ROOM_TYPES.keys()))
     max_room_size = random.randint(round(math.sqrt(min(x,y)/4)), round(math.sqrt(min(x,y)*4)))
     room_num = random.randint(round(math.sqrt((x+y)/4)), round(math.sqrt(x * y / (2*max_room_size))))
-    sampleGrid = generate_image(x, y, seed, room_filter, max_room_size, room_num=room_num)
-    return render_template('gridview.html', username=get_username(), image=sampleGrid.displayGrid(), x=x, y=y, seed=seed, args=f"rf={room_filter};rnum={room_num};mrsize={max_room_size}", room_types=list(ROOM_TYPES.keys()), maze=grab_map(sampleGrid))
+    args = f"rf={room_filter};rnum={room_num};mrsize={max_room_size}"
+    return maze_page(x, y, seed, args)
 
 @app.route('/maze/<int:x>/<int:y>/<int:seed>')
 @login_required
 def maze_view(x, y, seed):
     # make sure user input is valid
-    if x < 10 or x > 200 or y < 10 or y > 200:
-        flash(f"Invalid input: Width and height must be between 10 and 200.", "danger")
+    if x < 10 or x > MAX_SIZE or y < 10 or y > MAX_SIZE:
+        flash(f"Invalid input: Width and height must be between 10 and {MAX_SIZE}.", "danger")
         # Redirect to default maze
         return redirect(url_for('maze_view', x=30, y=30, seed=random.getrandbits(32)))
-    sampleGrid = generate_image(x, y, seed)
-    return render_template('gridview.html', username=get_username(), image=sampleGrid.displayGrid(), x=x, y=y, seed=seed, args="", room_types=list(ROOM_TYPES.keys()), maze=grab_map(sampleGrid))
+    return maze_page(x, y, seed)
 
 @app.route('/maze/<int:x>/<int:y>/<int:seed>/<string:args>')
 @login_required
 def arg_maze(x, y, seed, args):
-    if x < 10 or x > 200 or y < 10 or y > 200:
-        flash(f"Invalid input: Width and height must be between 10 and 200.", "danger")
+    if x < 10 or x > MAX_SIZE or y < 10 or y > MAX_SIZE:
+        flash(f"Invalid input: Width and height must be between 10 and {MAX_SIZE}.", "danger")
         return redirect(url_for('maze_view', x=30, y=30, seed=random.getrandbits(32)))
-    arg_list = args.split(';')
-    room_filter = None
-    room_num = 8
-    max_room_size = None
-    for arg in arg_list:
-        if arg.split('=')[0] == 'rf':
-            room_filter = int(arg.split('=')[1])
-        elif arg.split('=')[0] == 'rnum':
-            if int(arg.split('=')[1]) <= round(math.sqrt(x * y)):
-                room_num = int(arg.split('=')[1])
-            else:
-                flash(f"Invalid input: Room number must be less than {round(math.sqrt(x * y))} for dimensions ({x}, {y})", "danger")
-                return redirect('/')
-        elif arg.split('=')[0] == 'mrsize':
-            if int(arg.split('=')[1]) < 5 or int(arg.split('=')[1]) > min(x,y):
-                flash(f"Invalid input: Max room size must be between 5 and {min(x,y)}.", "danger")
-                return redirect('/')
-            else:
-                max_room_size = int(arg.split('=')[1])
-
-    if room_filter and max_room_size:
-        sampleGrid = generate_image(x, y, seed, room_filter, max_room_size, room_num=room_num)
-    elif room_filter:
-        sampleGrid = generate_image(x, y, seed, room_filter, room_num=room_num)
-    elif max_room_size:
-        sampleGrid = generate_image(x, y, seed, max_room_size=max_room_size, room_num=room_num)
+    try:
+        parse_maze_args(x, y, args)
+    except ValueError as e:
+        flash(str(e), "danger")
+        return redirect('/')
+    return maze_page(x, y, seed, args)
+
+@app.route('/maze/<int:x>/<int:y>/<int:seed>.png', defaults={'args': ''}, endpoint='maze_image_default')
+@app.route('/maze/<int:x>/<int:y>/<int:seed>/<string:args>.png')
+def maze_image(x, y, seed, args):
+    '''
+    Serves the png of a maze, a seed always draws the same image so browsers may keep it
+    The etag is known without generating, so revalidation answers 304 straight away
+    A large maze that is not cached is handed to the job queue and answered with 503 until it is built, anonymous callers get 401
+    '''
+    etag = hashlib.sha1(f"{grid.GENERATOR_VERSION}:{x}:{y}:{seed}:{args}".encode()).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
     else:
-        sampleGrid = generate_image(x, y, seed, room_num=room_num)
-    return render_template('gridview.html', username=get_username(), image=sampleGrid.displayGrid(), x=x, y=y, seed=seed, room_types=list(ROOM_TYPES.keys()), args=args, maze=grab_map(sampleGrid))
+        if x < 10 or x > MAX_SIZE or y < 10 or y > MAX_SIZE:
+            abort(404)
+        try:
+            parse_maze_args(x, y, args)
+        except ValueError:
+            abort(404)
+        if maze_pending(x, y, seed, args):
+            return retry_later()
+        response = app.response_class(load_maze(x, y, seed, args)['image'], mimetype='image/png')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
+
+@app.route('/maze/<int:x>/<int:y>/<int:seed>/tile/<int:z>/<int:tx>/<int:ty>.png', defaults={'args': ''}, endpoint='maze_tile_default')
+@app.route('/maze/<int:x>/<int:y>/<int:seed>/<string:args>/tile/<int:z>/<int:tx>/<int:ty>.png')
+def maze_tile(x, y, seed, args, z, tx, ty):
+    '''
+    Serves one tile of a maze's tile pyramid, cached like the maze's png
+    A large maze that is not cached is handed to the job queue and answered with 503 until it is built, anonymous callers get 401
+    '''
+    etag = hashlib.sha1(f"{grid.GENERATOR_VERSION}:{x}:{y}:{seed}:{args}:{z}:{tx}:{ty}".encode()).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        if x < 10 or x > MAX_SIZE or y < 10 or y > MAX_SIZE or z >= render.tile_levels(x, y):
+            abort(404)
+        across, down = render.tile_count(x, y, z)
+        if tx >= across or ty >= down:
+            abort(404)
+        try:
+            parse_maze_args(x, y, args)
+        except ValueError:
+            abort(404)
+        key = (x, y, seed, args, z, tx, ty)
+        png = tile_cache.get(key)
+        if png is None:
+            if maze_pending(x, y, seed, args):
+                return retry_later()
+            png = load_maze(x, y, seed, args)['grid'].tile(z, tx, ty)
+            tile_cache.put(key, png, len(png))
+        response = app.response_class(png, mimetype='image/png')
+    response.set_etag(etag)
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
+
+# Streamed mazes only hold one row at a time, so they may be far taller than a generated one
+STREAM_MAX_HEIGHT = 100000
+
+@app.route('/maze/stream/<int:x>/<int:y>/<int:seed>.txt', defaults={'scale': None})
+@app.route('/maze/stream/<int:x>/<int:y>/<int:seed>.png', defaults={'scale': 1}, endpoint='stream_maze_image')
+@login_required
+def stream_maze(x, y, seed, scale):
+    '''
+    Sends a perfect maze without rooms as it is generated, one row at a time, as text or as a png with a cell per pixel
+    The first rows reach the client before the last ones are made
+    '''
+    if x < 10 or x > MAX_SIZE or y < 10 or y > STREAM_MAX_HEIGHT:
+        abort(404)
+    rows = grid.streamRows(x, y, seed)
+    if scale is None:
+        return app.response_class(render.text_rows(rows, grid.TEXT_TABLE), mimetype='text/plain')
+    return app.response_class(render.encode_png_rows(rows, x, y, grid.PALETTE, scale), mimetype='image/png')
+
+@app.route('/jobs', methods=['POST'])
+@login_required
+def submit_job():
+    '''Queues a maze given as json {x, y, seed, args}, answering with the job's id straight away'''
+    x, y, seed, args = request.json.get('x'), request.json.get('y'), request.json.get('seed'), request.json.get('args') or ""
+    if not valid_seed(seed):
+        return jsonify({"error": f"Seed must be an int from 0 to {grid.SEED_LIMIT - 1}."}), 400
+    if type(x) != int or type(y) != int or x < 10 or x > MAX_SIZE or y < 10 or y > MAX_SIZE:
+        return jsonify({"error": f"Width and height must be between 10 and {MAX_SIZE}."}), 400
+    try:
+        parse_maze_args(x, y, args)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    job = job_queue.submit(x, y, seed, args)
+    return jsonify(dict(job.status(), status_url=url_for('job_status', job_id=job.id))), 202
+
+@app.route('/jobs/<string:job_id>')
+@login_required
+def job_status(job_id):
+    '''The stage of a job, with the maze's image url and rooms once it is done'''
+    job = job_queue.get(job_id)
+    if job is None:
+        abort(404)
+    status = job.status()
+    if job.stage == 'done':
+        # a job another worker process ran is cached here too, the page asks this one for the maze's png next
+        if job.key not in maze_cache:
+            finish_job(job)
+        x, y, seed, args = job.key
+        status['image_url'] = image_url(x, y, seed, args)
+        status['maze'] = job.result['maze']
+    return jsonify(status)
+
+@app.route('/metrics')
+def metrics_page():
+    '''Stage timings and cache counters in the Prometheus text format'''
+    stats = maze_cache.stats()
+    descriptions = description_cache.stats()
+    tiles = tile_cache.stats()
+    body = metrics.render() + \
+        metrics.sample('forgeon_maze_cache_hits_total', 'counter', 'Maze cache lookups that found the maze.', stats['hits']) + \
+        metrics.sample('forgeon_maze_cache_misses_total', 'counter', 'Maze cache lookups that had to generate the maze.', stats['misses']) + \
+        metrics.sample('forgeon_maze_cache_evictions_total', 'counter', 'Mazes evicted from the cache.', stats['evictions']) + \
+        metrics.sample('forgeon_maze_cache_entries', 'gauge', 'Mazes held in the cache.', stats['entries']) + \
+        metrics.sample('forgeon_maze_cache_bytes', 'gauge', 'Estimated size of the cached mazes.', stats['bytes']) + \
+        metrics.sample('forgeon_description_cache_hits_total', 'counter', 'Room descriptions read from the cache.', descriptions['hits']) + \
+        metrics.sample('forgeon_description_cache_misses_total', 'counter', 'Room descriptions that had to be generated.', descriptions['misses']) + \
+        metrics.sample('forgeon_tile_cache_hits_total', 'counter', 'Maze tiles read from the cache.', tiles['hits']) + \
+        metrics.sample('forgeon_tile_cache_misses_total', 'counter', 'Maze tiles that had to be rendered.', tiles['misses']) + \
+        metrics.sample('forgeon_showcase_built_total', 'counter', 'Welcome page mazes built for the showcase pool.', showcase_pool.stats()['built'])
+    return app.response_class(body, mimetype='text/plain; version=0.0.4')
 
 @app.route('/maze/custom', methods=['POST'])
 @login_required
@@ -236,22 +440,68 @@ def custom_maze():
 @app.route('/save-maze', methods=['POST'])
 @login_required
 def save_maze():
-    cursor.execute("SELECT MAX(maze_id) FROM Maze WHERE user = ?", (current_user.username,))
-    maze_id = cursor.fetchone()
-    if maze_id[0] != None:
-        maze_id = int(maze_id[0]) + 1
-    else:
-        maze_id = 1
-    # print(request.form.get('name'))
-    cursor.execute("INSERT INTO Maze (maze_id, user, name, x, y, seed, args) VALUES (?, ?, ?, ?, ?, ?, ?)", (maze_id, current_user.username, request.json.get('name'), request.json.get('x'), request.json.get('y'), request.json.get('seed'), request.json.get('args')))
-    connection.commit()
+    x, y, seed, args = request.json.get('x'), request.json.get('y'), request.json.get('seed'), request.json.get('args') or ""
+    if type(x) != int or type(y) != int or not valid_seed(seed) or x < 10 or x > MAX_SIZE or y < 10 or y > MAX_SIZE:
+        return jsonify({"success": False}), 400
+    try:
+        parse_maze_args(x, y, args)
+    except ValueError:
+        return jsonify({"success": False}), 400
+    if maze_pending(x, y, seed, args):
+        return retry_later(jsonify({"success": False}))
+    # the maze itself is stored, so later changes to the generator cannot change a saved maze
+    blob = load_maze(x, y, seed, args)['grid'].serialize()
+    database.save_maze(current_user.username, request.json.get('name'), x, y, seed, args, blob)
     return jsonify({"success": True})
 
+def load_saved_maze(maze_id):
+    '''
+    Returns the (x, y, seed, args, blob) of one of the user's saved mazes, aborting with 404 when there is none
+    Mazes saved before blobs were stored are generated from their seed and given one, large ones by the job queue
+    '''
+    row = database.find_maze(current_user.username, maze_id)
+    if row is None:
+        abort(404)
+    x, y, seed, args, blob = row
+    args = args or ""
+    if blob is None:
+        if maze_pending(x, y, seed, args):
+            abort(retry_later(app.response_class("This maze is being rebuilt, try again in a moment.", mimetype='text/plain')))
+        blob = load_maze(x, y, seed, args)['grid'].serialize()
+        database.set_maze_grid(current_user.username, maze_id, blob)
+    return x, y, seed, args, blob
+
+@app.route('/my-mazes/<int:maze_id>')
+@login_required
+def saved_maze(maze_id):
+    x, y, seed, args, blob = load_saved_maze(maze_id)
+    sampleGrid = grid.Grid.deserialize(blob)
+    # tiles are drawn from the seed, which only gives the saved maze back while the generator is unchanged
+    tiles = tile_context(x, y, seed, args) if sampleGrid.generator == grid.GENERATOR_VERSION else {}
+    return render_template('gridview.html', username=get_username(), image_url=url_for('saved_maze_image', maze_id=maze_id), x=x, y=y, seed=seed, args=args, room_types=list(ROOM_TYPES.keys()), maze=grab_map(sampleGrid), **tiles)
+
+@app.route('/my-mazes/<int:maze_id>.png')
+@login_required
+def saved_maze_image(maze_id):
+    '''
+    Serves the png of a saved maze, revalidated since sqlite may give a deleted maze's id to a new one
+    The etag only needs the stored blob, so revalidation answers 304 without drawing the maze
+    '''
+    x, y, seed, args, blob = load_saved_maze(maze_id)
+    etag = hashlib.sha1(blob).hexdigest()
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = app.response_class(grid.Grid.deserialize(blob).image(raw=True), mimetype='image/png')
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
+
 @app.route('/my-mazes')
 @login_required
 def user_mazes():
-    cursor.execute("SELECT maze_id, name, x, y, seed, args FROM Maze WHERE user = ? ORDER BY maze_id", (current_user.username,))
-    mazes = cursor.fetchall()
+    mazes = database.user_mazes(current_user.username)
     if len(mazes) == 0:
         return render_template('mazes.html', mazes=None, username=get_username())
     return render_template('mazes.html', mazes=[list(i) for i in mazes], username=get_username())
@@ -259,17 +509,13 @@ def user_mazes():
 @app.route('/delete-maze', methods=['POST'])
 @login_required
 def delete_maze():
-    cursor.execute("DELETE FROM Maze WHERE maze_id = ? AND user = ?", (int(request.json.get('id')), current_user.username))
-    cursor.execute("SELECT MAX(maze_id) FROM Maze WHERE user = ?", (current_user.username,))
-    maze_count = cursor.fetchone()
-    if maze_count[0] != None:
-        maze_count = int(maze_count[0]) + 1
-    else:
-        maze_count = 1
-
-    for i in range(int(request.json.get('id')) + 1, maze_count):
-        cursor.execute("UPDATE Maze SET maze_id = ? WHERE maze_id = ? AND user = ?", (i - 1, i, current_user.username))
-
-    connection.commit()
-
+    database.delete_mazes(current_user.username, [int(request.json.get('id'))])
     return jsonify({"success": True})
+
+@app.route('/delete-mazes', methods=['POST'])
+@login_required
+def delete_mazes():
+    ids = request.json.get('ids')
+    if type(ids) != list or any(type(i) != int for i in ids):
+        return jsonify({"success": False}), 400
+    return jsonify({"success": True, "deleted": database.delete_mazes(current_user.username, ids)})
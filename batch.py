@@ -0,0 +1,149 @@
+"""
+	Builds mazes in bulk, run with "python batch.py --help".
+	Generation and rendering are spread over a pool of processes, and each
+	maze is written as a png, a text file and its room metadata, either
+	into a directory or as one NDJSON line per maze.
+"""
+import argparse
+import base64
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from forge import generate_image, grab_map, parse_maze_args
+from grid import PALETTE, TEXT_TABLE, streamRows
+from render import encode_png_rows, text_rows
+
+# builds one maze, returning everything that gets written about it
+def build(job):
+	x, y, seed, args, scale, symbols = job
+	sampleGrid = generate_image(x, y, seed, **parse_maze_args(x, y, args))
+	rooms = []
+	typed = [room for room in sampleGrid.rooms if room.type_id is not None]
+	for room, (coords, name, description) in zip(typed, grab_map(sampleGrid)):
+		rooms.append({
+			'type': name,
+			'topleft': [room.x, room.y],
+			'bottomright': [room.x + room.width, room.y + room.height],
+			'description': description,
+		})
+	return {
+		'x': x,
+		'y': y,
+		'seed': seed,
+		'args': args,
+		'png': sampleGrid.image(scale, raw=True),
+		'text': sampleGrid.text(rooms=symbols),
+		'rooms': rooms,
+		'placement': sampleGrid.placement,
+	}
+
+# passes rows through, writing each as a line of text into file on the way
+def echo_text(rows, file):
+	for row in rows:
+		file.writelines(text_rows((row,), TEXT_TABLE))
+		yield row
+
+# streams one perfect maze without rooms into <seed>.png and <seed>.txt, holding a single row at a time
+def build_stream(job):
+	x, y, seed, directory, scale = job
+	name = os.path.join(directory, str(seed))
+	with open(name + '.txt', 'w') as text, open(name + '.png', 'wb') as image:
+		for data in encode_png_rows(echo_text(streamRows(x, y, seed), text), x, y, PALETTE, scale):
+			image.write(data)
+	with open(name + '.json', 'w') as file:
+		json.dump({'x': x, 'y': y, 'seed': seed, 'args': '', 'rooms': [], 'placement': None}, file)
+
+# parses seeds given as "5", "1-100" or a mix of both
+def parse_seeds(values):
+	seeds = []
+	for value in values:
+		first, _, last = value.partition('-')
+		seeds.extend(range(int(first), int(last) + 1) if last else [int(first)])
+	return seeds
+
+# writes a maze as <seed>.png, <seed>.txt and <seed>.json into directory
+def write_files(directory, maze):
+	name = os.path.join(directory, str(maze['seed']))
+	with open(name + '.png', 'wb') as file:
+		file.write(maze['png'])
+	with open(name + '.txt', 'w') as file:
+		file.write(maze['text'])
+	with open(name + '.json', 'w') as file:
+		json.dump({key: maze[key] for key in ('x', 'y', 'seed', 'args', 'rooms', 'placement')}, file)
+
+# writes a maze as one json line, with the png base64 encoded
+def write_line(stream, maze):
+	record = dict(maze, png=base64.b64encode(maze['png']).decode('utf8'))
+	stream.write(json.dumps(record) + '\n')
+
+def main():
+	parser = argparse.ArgumentParser(description='Builds mazes in bulk over a pool of processes.')
+	parser.add_argument('--seeds', nargs='+', required=True, help='seeds such as "7" or ranges such as "1-1000"')
+	parser.add_argument('--size', default='30x30', help='maze size as WIDTHxHEIGHT')
+	parser.add_argument('--room-filter', type=int, help='bitmask of the ROOM_TYPES to use')
+	parser.add_argument('--room-num', type=int, default=8, help='number of rooms per maze')
+	parser.add_argument('--max-room-size', type=int, help='largest width or height of a room')
+	parser.add_argument('--room-gap', type=int, help='fewest wall cells kept between two rooms')
+	parser.add_argument('--room-fill', type=float, help='stop adding rooms once they cover this share of the grid')
+	parser.add_argument('--carve-blocks', type=int, help='carve each maze in this many blocks at once, for very large mazes')
+	parser.add_argument('--scale', type=int, help='pixels per cell, fits the 640x480 canvas when left out')
+	parser.add_argument('--room-symbols', action='store_true', help='draw rooms in the text with their room type symbol')
+	parser.add_argument('--stream', action='store_true', help='generate row by row with memory for one row only, '
+		'making perfect mazes without rooms, needs --out and draws the png with --scale pixels per cell (1 when left out)')
+	parser.add_argument('--workers', type=int, default=os.cpu_count(), help='number of processes')
+	output = parser.add_mutually_exclusive_group(required=True)
+	output.add_argument('--out', help='directory to write <seed>.png, <seed>.txt and <seed>.json into')
+	output.add_argument('--ndjson', help='file to write one json line per maze into, "-" for stdout')
+	options = parser.parse_args()
+
+	x, y = (int(i) for i in options.size.split('x'))
+	if options.stream:
+		if not options.out:
+			parser.error('--stream writes files, so it needs --out')
+		os.makedirs(options.out, exist_ok=True)
+		seeds = parse_seeds(options.seeds)
+		start = time.perf_counter()
+		with ProcessPoolExecutor(max_workers=options.workers) as pool:
+			list(pool.map(build_stream, [(x, y, seed, options.out, options.scale or 1) for seed in seeds]))
+		elapsed = time.perf_counter() - start
+		print(f'Streamed {len(seeds)} mazes in {elapsed:.2f}s ({len(seeds)/elapsed:.1f} mazes/s) with {options.workers} workers', file=sys.stderr)
+		return
+	args = f'rnum={options.room_num}'
+	if options.room_filter:
+		args = f'rf={options.room_filter};' + args
+	if options.max_room_size:
+		args += f';mrsize={options.max_room_size}'
+	if options.room_gap:
+		args += f';gap={options.room_gap}'
+	if options.room_fill:
+		args += f';fill={options.room_fill}'
+	if options.carve_blocks:
+		args += f';blocks={options.carve_blocks}'
+	try:
+		parse_maze_args(x, y, args)
+	except ValueError as e:
+		parser.error(str(e))
+	jobs = [(x, y, seed, args, options.scale, options.room_symbols) for seed in parse_seeds(options.seeds)]
+
+	if options.out:
+		os.makedirs(options.out, exist_ok=True)
+		write = lambda maze: write_files(options.out, maze)
+		stream = None
+	else:
+		stream = sys.stdout if options.ndjson == '-' else open(options.ndjson, 'w')
+		write = lambda maze: write_line(stream, maze)
+
+	start = time.perf_counter()
+	with ProcessPoolExecutor(max_workers=options.workers) as pool:
+		# results come back in seed order, chunks keep the per maze overhead of the pool low
+		for maze in pool.map(build, jobs, chunksize=max(1, len(jobs) // (options.workers*8))):
+			write(maze)
+	elapsed = time.perf_counter() - start
+	if stream is not None and stream is not sys.stdout:
+		stream.close()
+	print(f'Built {len(jobs)} mazes in {elapsed:.2f}s ({len(jobs)/elapsed:.1f} mazes/s) with {options.workers} workers', file=sys.stderr)
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,148 @@
+"""
+	Times the maze generation pipeline, run with "python benchmark.py".
+	Each stage is timed over a matrix of sizes with fixed seeds, reporting the
+	median and percentile timings and the peak memory allocated while it runs.
+	Results can be saved as json and compared against an earlier run.
+"""
+import argparse
+import json
+import platform
+import random
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from statistics import median
+from grid import Grid, streamRows, WALL, FLOOR
+from paths import carve_blocks, carve_passages, connect_regions
+from forge import generate_image, grab_map
+from MazeRoomDescr import generate_room_description, description_cache
+
+SIZES = [(30, 30), (200, 200), (1000, 1000)]
+SEEDS = [1, 2, 3]
+ROOMS = 8
+MAX_ROOM_SIZE = 8
+# blocks for the carve_blocks stage, carved by as many processes as there are cores
+BLOCKS = 4
+
+# a fresh grid with rooms, ready to have its path generated
+def rooms_grid(x, y, seed):
+	sampleGrid = Grid(x, y, seed)
+	sampleGrid.generateRooms(ROOMS, max_room_size=MAX_ROOM_SIZE)
+	return sampleGrid
+
+# the carved cells of a grid, ready to have their regions joined
+def carved_cells(x, y, seed):
+	cells = Grid(x, y, seed).cells.ravel().tolist()
+	carve_passages(cells, x, y, 1, 1, random.Random(seed), WALL)
+	return cells, x, y, random.Random(seed)
+
+# a fully generated maze
+def full_grid(x, y, seed):
+	return generate_image(x, y, seed, max_room_size=MAX_ROOM_SIZE, room_num=ROOMS)
+
+# a fully generated maze, with no room descriptions cached so grab_map has to make them all
+def cold_grid(x, y, seed):
+	sampleGrid = full_grid(x, y, seed)
+	description_cache.clear()
+	return sampleGrid
+
+# a fully generated maze whose room descriptions are already cached, as on a reload
+def warm_grid(x, y, seed):
+	sampleGrid = full_grid(x, y, seed)
+	grab_map(sampleGrid)
+	return sampleGrid
+
+# Each stage is (setup, run), only run is timed and setup's result is passed to it
+STAGES = {
+	'makeGrid': (lambda x, y, seed: Grid(x, y, seed), lambda sampleGrid: sampleGrid.makeGrid()),
+	'generateRooms': (lambda x, y, seed: Grid(x, y, seed), lambda sampleGrid: sampleGrid.generateRooms(ROOMS, max_room_size=MAX_ROOM_SIZE)),
+	'carve': (
+		lambda x, y, seed: (Grid(x, y, seed).cells.ravel().tolist(), x, y, random.Random(seed)),
+		lambda state: carve_passages(state[0], state[1], state[2], 1, 1, state[3], WALL)),
+	'carve_blocks': (
+		lambda x, y, seed: (Grid(x, y, seed).cells, x, y, random.Random(seed)),
+		lambda state: carve_blocks(state[0], state[1], state[2], state[3], WALL, BLOCKS)),
+	'connect_regions': (carved_cells, lambda state: connect_regions(state[0], state[1], state[2], state[3], WALL, FLOOR)),
+	'streamRows': (lambda x, y, seed: (x, y, seed), lambda state: sum(1 for _ in streamRows(*state))),
+	'generatePath': (rooms_grid, lambda sampleGrid: sampleGrid.generatePath()),
+	'image': (full_grid, lambda sampleGrid: sampleGrid.image()),
+	'text': (full_grid, lambda sampleGrid: sampleGrid.text()),
+	'grab_map': (cold_grid, grab_map),
+	'grab_map_warm': (warm_grid, grab_map),
+	'generate_room_description': (lambda x, y, seed: random.Random(seed), generate_room_description),
+}
+
+# nearest rank percentile of already sorted values
+def percentile(values, p):
+	return values[max(0, min(len(values) - 1, round(p/100*len(values) + 0.5) - 1))]
+
+def measure(stage, x, y, seeds, repeat):
+	"""Runs a stage repeat times per seed, returning its sorted timings in seconds and
+	the peak memory in bytes traced during one extra run."""
+	setup, run = stage
+	timings = []
+	for seed in seeds:
+		for _ in range(repeat):
+			state = setup(x, y, seed)
+			start = time.perf_counter()
+			run(state)
+			timings.append(time.perf_counter() - start)
+	# tracing slows allocation down a lot, so memory is measured on a separate run
+	state = setup(x, y, seeds[0])
+	tracemalloc.start()
+	run(state)
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	return sorted(timings), peak
+
+def main():
+	parser = argparse.ArgumentParser(description='Times the maze generation pipeline.')
+	parser.add_argument('--sizes', nargs='+', default=[f'{x}x{y}' for x, y in SIZES], help='grid sizes as WIDTHxHEIGHT')
+	parser.add_argument('--stages', nargs='+', default=list(STAGES), choices=list(STAGES))
+	parser.add_argument('--seeds', nargs='+', type=int, default=SEEDS)
+	parser.add_argument('--repeat', type=int, default=3, help='runs per seed')
+	parser.add_argument('--output', help='json file to save the results into')
+	parser.add_argument('--compare', help='json file of an earlier run to compare the medians against')
+	args = parser.parse_args()
+
+	baseline = {}
+	if args.compare:
+		with open(args.compare) as file:
+			baseline = {(result['stage'], result['size']): result for result in json.load(file)['results']}
+
+	results = []
+	for name in args.stages:
+		for size in args.sizes:
+			x, y = (int(i) for i in size.split('x'))
+			timings, peak = measure(STAGES[name], x, y, args.seeds, args.repeat)
+			result = {
+				'stage': name,
+				'size': size,
+				'runs': len(timings),
+				'min': timings[0],
+				'median': median(timings),
+				'p90': percentile(timings, 90),
+				'p99': percentile(timings, 99),
+				'peak_bytes': peak,
+			}
+			results.append(result)
+			line = f"{name:<26} {size:>11}  median {result['median']*1000:10.3f} ms  p90 {result['p90']*1000:10.3f} ms" \
+				f"  p99 {result['p99']*1000:10.3f} ms  peak {peak/2**20:8.2f} MiB"
+			previous = baseline.get((name, size))
+			if previous:
+				line += f"  {(result['median']/previous['median'] - 1)*100:+7.1f}% vs baseline"
+			print(line)
+
+	if args.output:
+		with open(args.output, 'w') as file:
+			json.dump({
+				'date': datetime.now(timezone.utc).isoformat(),
+				'python': platform.python_version(),
+				'machine': platform.machine(),
+				'seeds': args.seeds,
+				'repeat': args.repeat,
+				'results': results,
+			}, file, indent=1)
+
+if __name__ == '__main__':
+	main()
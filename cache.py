@@ -0,0 +1,69 @@
+import threading
+from collections import OrderedDict
+
+# Class for a bounded cache that evicts the least recently used entries
+class LRUCache:
+	def __init__(self, max_entries = 256, max_bytes = 64*2**20):
+		if type(max_entries) != int or type(max_bytes) != int:
+			raise BaseException('LRUCache() - The inputs "max_entries" and "max_bytes" must be ints.')
+		if max_entries < 1 or max_bytes < 1:
+			raise BaseException('LRUCache() - The inputs "max_entries" and "max_bytes" must be at least 1.')
+		self.max_entries = max_entries
+		self.max_bytes = max_bytes
+		self.entries = OrderedDict() # key -> (value, size), oldest first
+		self.size = 0
+		self.hits = 0
+		self.misses = 0
+		self.evictions = 0
+		self.lock = threading.Lock()
+
+	def __len__(self):
+		return len(self.entries)
+
+	def __contains__(self, key):
+		return key in self.entries
+
+	# returns the value for key, or None when it is not cached
+	def get(self, key):
+		with self.lock:
+			entry = self.entries.get(key)
+			if entry is None:
+				self.misses += 1
+				return None
+			self.entries.move_to_end(key)
+			self.hits += 1
+			return entry[0]
+
+	# caches value under key, evicting the oldest entries until both budgets are met
+	def put(self, key, value, size = 0):
+		with self.lock:
+			if key in self.entries:
+				self.size -= self.entries.pop(key)[1]
+			self.entries[key] = (value, size)
+			self.size += size
+			while len(self.entries) > self.max_entries or (self.size > self.max_bytes and len(self.entries) > 1):
+				self.size -= self.entries.popitem(last=False)[1][1]
+				self.evictions += 1
+
+	# returns the cached value for key, calling create() and caching its value on a miss
+	def get_or_create(self, key, create, sizeof = lambda value: 0):
+		value = self.get(key)
+		if value is None:
+			value = create()
+			self.put(key, value, sizeof(value))
+		return value
+
+	def clear(self):
+		with self.lock:
+			self.entries.clear()
+			self.size = 0
+
+	# counters describing how well the cache is doing
+	def stats(self):
+		return {
+			'entries': len(self.entries),
+			'bytes': self.size,
+			'hits': self.hits,
+			'misses': self.misses,
+			'evictions': self.evictions,
+		}
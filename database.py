@@ -0,0 +1,227 @@
+"""
+	Access to the saved mazes in Forgeon.db. Each request borrows its own
+	connection from a pool and gives it back when the request ends, so
+	requests never share a cursor. The schema is brought up to date on
+	startup by the MIGRATIONS, tracked with sqlite's user_version.
+	Background jobs are kept in the same file, so every worker process
+	can answer for a job another one is building.
+"""
+import json
+import queue
+import sqlite3
+from flask import g
+
+DATABASE = "Forgeon.db"
+POOL_SIZE = 8
+
+# Class for a bounded pool of sqlite connections that can be handed between threads and greenlets
+class ConnectionPool:
+	def __init__(self, path, size = POOL_SIZE):
+		if type(size) != int or size < 1:
+			raise BaseException('ConnectionPool() - The input "size" must be an int of at least 1.')
+		self.path = path
+		self.idle = queue.LifoQueue(maxsize=size)
+
+	def connect(self):
+		# only one request uses a connection at a time, so it may move between threads
+		connection = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+		connection.execute("PRAGMA journal_mode=WAL")
+		connection.execute("PRAGMA synchronous=NORMAL")
+		connection.execute("PRAGMA foreign_keys=ON")
+		return connection
+
+	# an idle connection, or a new one when every pooled connection is in use
+	def acquire(self):
+		try:
+			return self.idle.get_nowait()
+		except queue.Empty:
+			return self.connect()
+
+	# returns a connection to the pool, closing it when the pool is already full
+	def release(self, connection):
+		if connection.in_transaction:
+			connection.rollback()
+		try:
+			self.idle.put_nowait(connection)
+		except queue.Full:
+			connection.close()
+
+	def close(self):
+		while True:
+			try:
+				self.idle.get_nowait().close()
+			except queue.Empty:
+				return
+
+def create_maze_table(connection):
+	"""The table as it was before migrations, with the grid blob column added."""
+	connection.execute(""" CREATE TABLE IF NOT EXISTS Maze (maze_id BIGINT, user varchar(255), name varchar(255),
+	x INT, y INT, seed INT, args varchar(512), grid BLOB) """)
+	if 'grid' not in [column[1] for column in connection.execute("PRAGMA table_info(Maze)")]:
+		connection.execute("ALTER TABLE Maze ADD COLUMN grid BLOB")
+
+def add_maze_keys(connection):
+	"""Rebuilds Maze with a primary key, and an index so a user's mazes are found without a full scan."""
+	connection.execute(""" CREATE TABLE Maze_keyed (id INTEGER PRIMARY KEY, maze_id BIGINT NOT NULL, user varchar(255) NOT NULL,
+	name varchar(255), x INT, y INT, seed INT, args varchar(512), grid BLOB) """)
+	connection.execute(""" INSERT INTO Maze_keyed (maze_id, user, name, x, y, seed, args, grid)
+	SELECT maze_id, user, name, x, y, seed, args, grid FROM Maze WHERE user IS NOT NULL ORDER BY user, maze_id """)
+	connection.execute("DROP TABLE Maze")
+	connection.execute("ALTER TABLE Maze_keyed RENAME TO Maze")
+	connection.execute("CREATE INDEX maze_user_id ON Maze (user, maze_id)")
+
+def add_maze_positions(connection):
+	"""Renames maze_id to position, it only orders a user's mazes now that rows keep their id for good."""
+	connection.execute("DROP INDEX maze_user_id")
+	connection.execute("ALTER TABLE Maze RENAME COLUMN maze_id TO position")
+	connection.execute("CREATE INDEX maze_user_position ON Maze (user, position)")
+
+def add_job_table(connection):
+	"""Adds the jobs shared by the worker processes, with the maze each one built once it is done."""
+	connection.execute(""" CREATE TABLE Job (id varchar(32) PRIMARY KEY, x INT NOT NULL, y INT NOT NULL, seed INT NOT NULL,
+	args varchar(512) NOT NULL, stage varchar(16) NOT NULL, error TEXT, submitted REAL NOT NULL, finished REAL,
+	grid BLOB, image BLOB, maze TEXT) """)
+	connection.execute("CREATE INDEX job_key ON Job (x, y, seed, args)")
+
+# MIGRATIONS[i] takes a database from user_version i to i + 1, append new steps and never edit old ones
+MIGRATIONS = [
+	create_maze_table,
+	add_maze_keys,
+	add_maze_positions,
+	add_job_table,
+]
+
+def migrate(connection):
+	"""Runs the migrations the database has not had yet, each in its own transaction. Returns the new version."""
+	version = connection.execute("PRAGMA user_version").fetchone()[0]
+	for step in range(version, len(MIGRATIONS)):
+		with connection:
+			# sqlite only wraps data changes in a transaction by itself, schema changes need it opened
+			connection.execute("BEGIN")
+			MIGRATIONS[step](connection)
+			# PRAGMA does not take parameters, step is always an int
+			connection.execute(f"PRAGMA user_version = {step + 1}")
+	return len(MIGRATIONS)
+
+pool = None
+
+def init_app(app, path = DATABASE):
+	"""Migrates the database at path and gives each of app's requests a pooled connection."""
+	global pool
+	pool = ConnectionPool(path)
+	connection = pool.acquire()
+	migrate(connection)
+	pool.release(connection)
+	app.teardown_appcontext(close_db)
+
+def get_db():
+	"""The connection of the current request, borrowed from the pool on first use."""
+	if 'db' not in g:
+		g.db = pool.acquire()
+	return g.db
+
+def close_db(exception = None):
+	connection = g.pop('db', None)
+	if connection is not None:
+		pool.release(connection)
+
+def save_maze(user, name, x, y, seed, args, blob):
+	"""Adds a maze to the end of user's library, returning its id."""
+	db = get_db()
+	with db:
+		# takes the write lock before reading, so two saves cannot pick the same position
+		db.execute("BEGIN IMMEDIATE")
+		position = db.execute("SELECT COALESCE(MAX(position), 0) + 1 FROM Maze WHERE user = ?", (user,)).fetchone()[0]
+		cursor = db.execute("INSERT INTO Maze (position, user, name, x, y, seed, args, grid) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+			(position, user, name, x, y, seed, args, blob))
+	return cursor.lastrowid
+
+def find_maze(user, maze_id):
+	"""The (x, y, seed, args, grid) of one of user's mazes, or None."""
+	return get_db().execute("SELECT x, y, seed, args, grid FROM Maze WHERE user = ? AND id = ?", (user, maze_id)).fetchone()
+
+def set_maze_grid(user, maze_id, blob):
+	db = get_db()
+	with db:
+		db.execute("UPDATE Maze SET grid = ? WHERE user = ? AND id = ?", (blob, user, maze_id))
+
+def user_mazes(user):
+	"""The (id, name, x, y, seed, args) of each of user's mazes, in the order they were saved."""
+	return get_db().execute("SELECT id, name, x, y, seed, args FROM Maze WHERE user = ? ORDER BY position", (user,)).fetchall()
+
+# ids per DELETE statement, well under sqlite's limit on bound parameters
+DELETE_CHUNK = 500
+
+def delete_mazes(user, maze_ids):
+	"""Removes any number of user's mazes in one transaction, returning how many were removed.
+
+	Ids are stable and positions may have gaps, so nothing else is renumbered."""
+	maze_ids = list(maze_ids)
+	db = get_db()
+	deleted = 0
+	with db:
+		for start in range(0, len(maze_ids), DELETE_CHUNK):
+			chunk = maze_ids[start:start + DELETE_CHUNK]
+			deleted += db.execute(f"DELETE FROM Maze WHERE user = ? AND id IN ({','.join('?'*len(chunk))})", (user, *chunk)).rowcount
+	return deleted
+
+JOB_COLUMNS = "id, x, y, seed, args, stage, error, submitted, finished, grid, image, maze"
+
+def job_row(row):
+	"""A Job row with its rooms decoded, or None."""
+	if row is None or row[-1] is None:
+		return row
+	return row[:-1] + (json.loads(row[-1]),)
+
+# Class for the Job table, used from the job queue's own threads as well as from requests, so it borrows its connections from a pool directly
+class JobTable:
+	def __init__(self, connections = None):
+		# a ConnectionPool of its own, or None for the pool init_app made
+		self.connections = connections
+
+	def pool(self):
+		return pool if self.connections is None else self.connections
+
+	# runs query in its own transaction, returning its first row
+	def execute(self, query, parameters = ()):
+		connections = self.pool()
+		connection = connections.acquire()
+		try:
+			with connection:
+				return connection.execute(query, parameters).fetchone()
+		finally:
+			connections.release(connection)
+
+	def claim(self, job, since, before):
+		"""Adds job, unless a job for the same maze is done, or was submitted after since and is still running.
+		The row of that job is returned instead, None when job was added. Jobs that finished before before are removed."""
+		x, y, seed, args = job.key
+		connections = self.pool()
+		connection = connections.acquire()
+		try:
+			with connection:
+				# takes the write lock before looking, so two processes cannot both add a job for the same maze
+				connection.execute("BEGIN IMMEDIATE")
+				connection.execute("DELETE FROM Job WHERE finished < ? OR (finished IS NULL AND submitted < ?)", (before, since))
+				row = connection.execute(f""" SELECT {JOB_COLUMNS} FROM Job WHERE x = ? AND y = ? AND seed = ? AND args = ?
+				AND (stage = 'done' OR finished IS NULL) ORDER BY submitted DESC LIMIT 1 """, (x, y, seed, args)).fetchone()
+				if row is None:
+					connection.execute("INSERT INTO Job (id, x, y, seed, args, stage, submitted) VALUES (?, ?, ?, ?, ?, ?, ?)",
+						(job.id, x, y, seed, args, job.stage, job.submitted))
+		finally:
+			connections.release(connection)
+		return job_row(row)
+
+	def set_stage(self, job_id, stage):
+		# a finished job keeps its last stage
+		self.execute("UPDATE Job SET stage = ? WHERE id = ? AND finished IS NULL", (stage, job_id))
+
+	def finish(self, job):
+		result = job.result or {}
+		maze = json.dumps(result['maze']) if 'maze' in result else None
+		self.execute("UPDATE Job SET stage = ?, error = ?, finished = ?, grid = ?, image = ?, maze = ? WHERE id = ?",
+			(job.stage, job.error, job.finished, result.get('grid'), result.get('image'), maze, job.id))
+
+	def get(self, job_id):
+		"""The row of a job, or None."""
+		return job_row(self.execute(f"SELECT {JOB_COLUMNS} FROM Job WHERE id = ?", (job_id,)))
@@ -0,0 +1,112 @@
+"""
+	Generates mazes and their room descriptions, shared by the web
+	application and the batch command line without needing Flask.
+"""
+import math
+import random
+import grid
+from MazeRoomDescr import ROOM_TYPES, ROOM_TYPE_NAMES, describe_room
+from metrics import timed
+
+def generate_image(
+		x = 30, 
+		y = 30, 
+		seed = None, 
+		filter=sum([0 | (1 << i) for i in range(0, len(ROOM_TYPES.keys()))]), 
+		max_room_size=8, 
+		room_num=8,
+		min_gap=0,
+		fill_ratio=None,
+		blocks=1
+	):
+    """Creates a Grid object using the inputs and generates rooms/paths onto the grid, with a random seed when none is given."""
+    if seed is None:
+        seed = random.getrandbits(32)
+    with timed('generate'):
+        sampleGrid = grid.Grid(x,y,seed)
+        sampleGrid.generateRooms(room_num, max_room_size=max_room_size, filter=filter, min_gap=min_gap, fill_ratio=fill_ratio)
+        sampleGrid.generatePath(1, blocks=blocks)
+    return sampleGrid
+    
+def grab_map(grid):
+    '''
+    Takes the Grid and gets the room descriptions/locations
+    Returns a list of [coordinates, roomName, description] pairs for each room
+    '''
+    with timed('grab_map'):
+        maze_data = []    
+        for index, room in enumerate(grid.rooms):
+            if room.type_id is not None:
+                type_name = ROOM_TYPE_NAMES[room.type_id]
+                # Get coordinates for the room
+                coords = grid.toImageLocation((room.x, room.y), (room.x + room.width, room.y + room.height))
+                maze_data.append([
+                    '{},{},{},{}'.format(*coords),
+                    type_name,
+                    f"{type_name}: {describe_room(grid.seed, index, type_name)}"
+                ])
+    return maze_data
+
+# Most blocks a maze can be carved in, each is carved by its own process when there are enough cores
+MAX_BLOCKS = 64
+
+def parse_maze_args(x, y, args):
+    '''
+    Parses an "rf=..;rnum=..;mrsize=..;gap=..;fill=..;blocks=.." string into generate_image keyword arguments
+    Raises a ValueError holding the message for the user when an argument is out of range
+    '''
+    arg_list = args.split(';')
+    room_filter = None
+    room_num = 8
+    max_room_size = None
+    min_gap = 0
+    fill_ratio = None
+    blocks = 1
+    for arg in arg_list:
+        # empty pieces come from an empty string or a stray ";"
+        if not arg:
+            continue
+        name, equals, value = arg.partition('=')
+        if not equals or not value:
+            raise ValueError(f"Invalid input: \"{arg}\" must be given as name=value.")
+        if name == 'rf':
+            room_filter = int(value)
+        elif name == 'rnum':
+            if int(value) <= round(math.sqrt(x * y)):
+                room_num = int(value)
+            else:
+                raise ValueError(f"Invalid input: Room number must be less than {round(math.sqrt(x * y))} for dimensions ({x}, {y})")
+        elif name == 'mrsize':
+            # /maze/randomize picks sizes down to 2, its links have to load again
+            if int(value) < 2 or int(value) > min(x,y):
+                raise ValueError(f"Invalid input: Max room size must be between 2 and {min(x,y)}.")
+            else:
+                max_room_size = int(value)
+        elif name == 'gap':
+            if int(value) < 0 or int(value) > min(x,y) // 4:
+                raise ValueError(f"Invalid input: Room gap must be between 0 and {min(x,y) // 4}.")
+            else:
+                min_gap = int(value)
+        elif name == 'fill':
+            if not 0 < float(value) <= 1:
+                raise ValueError("Invalid input: Room fill must be above 0 and at most 1.")
+            else:
+                fill_ratio = float(value)
+        elif name == 'blocks':
+            if int(value) < 1 or int(value) > MAX_BLOCKS:
+                raise ValueError(f"Invalid input: Blocks must be between 1 and {MAX_BLOCKS}.")
+            else:
+                blocks = int(value)
+
+    kwargs = {'room_num': room_num}
+    if room_filter:
+        kwargs['filter'] = room_filter
+    if max_room_size:
+        kwargs['max_room_size'] = max_room_size
+    if min_gap:
+        kwargs['min_gap'] = min_gap
+    if fill_ratio:
+        kwargs['fill_ratio'] = fill_ratio
+    if blocks > 1:
+        kwargs['blocks'] = blocks
+    return kwargs
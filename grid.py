@@ -1,11 +1,32 @@
-from matplotlib import pyplot
 import random
-import io
 import base64
-from collections import deque
-from math import ceil
-from matplotlib.backends.backend_agg import FigureCanvasAgg as FigureCanvas
-from MazeRoomDescr import ROOM_TYPES
+import struct
+import zlib
+import numpy as np
+from MazeRoomDescr import ROOM_TYPES, ROOM_TYPE_NAMES, ROOM_TYPE_BY_RGB
+from paths import carve_blocks, carve_passages, connect_regions, eller_rows
+from render import encode_png, fit_cells, scale_cells, render_text, symbol_table, text_rows, tile_cells, tile_count, tile_levels, BACKGROUND
+from metrics import timed
+
+# Bump whenever a seed would generate a different maze, cached images are keyed on it
+GENERATOR_VERSION = 3
+
+# Binary format written by Grid.serialize, bump FORMAT_VERSION whenever the layout changes
+FORMAT_MAGIC = b'FGMZ'
+FORMAT_VERSION = 1
+# magic, format version, generator version, width, height, seed, room count
+FORMAT_HEADER = struct.Struct('>4sBHIIQI')
+# x, y, width, height, type id (255 for none) and the room's color
+FORMAT_ROOM = struct.Struct('>IIIIB3B')
+NO_TYPE = 255
+# seeds are stored in 64 bits, signed in the saved maze table, so only those below this can be kept
+SEED_LIMIT = 2**63
+
+# Cell kinds, a cell stores its index into the Grid's palette rather than a color
+WALL = 0
+FLOOR = 1
+# Default palette, walls and floors followed by every room type in ROOM_TYPES order
+PALETTE = [(0,0,0), (225,225,225)] + [info['rgb'] for info in ROOM_TYPES.values()]
 
 def colorToString(color):
 	"""Converts a RBG color into a character"""
@@ -29,12 +50,24 @@ def colorToString(color):
 	else:
 		return '_'
 
+# symbols of the default palette, for rows that have no Grid to ask
+TEXT_TABLE = symbol_table([colorToString(color) for color in PALETTE])
+
+def streamRows(x, y, seed):
+	"""Yields a perfect x by y maze one row at a time without building a Grid, see paths.eller_rows.
+	The rows are indexes into PALETTE with passages in WALL as generatePath carves them, so a streamed maze is
+	drawn in the same colours as a generated one, ready for text_rows or encode_png_rows. There are no rooms, they
+	are placed and joined over the whole grid by Grid.generateRooms and Grid.generatePath."""
+	if type(x) != int or type(y) != int:
+		raise BaseException('streamRows - The inputs "x" and "y" must be ints.')
+	if x < 3 or y < 3:
+		raise BaseException('streamRows - The input for "x" or "y" must be at least 3.')
+	return eller_rows(x, y, random.Random(seed), WALL, FLOOR)
 
 # Class for the Grid
 class Grid:
 	# initializes the grid's size
 	def __init__(self, x : int = 30, y : int = 30, seed : int = random.getrandbits(32)):
-		random.seed(seed)
 		if type(x) != int:
 			raise BaseException('Grid() - The input "x" must be an int.')
 		if type(y) != int:
@@ -44,108 +77,128 @@ class Grid:
 		self.x = x
 		self.y = y
 		self.seed = seed
-		self.grid = self.makeGrid()
+		# every random choice for this grid comes from its own generator, so concurrent grids cannot disturb each other's seed
+		self.rng = random.Random(seed)
+		self.palette = list(PALETTE)
+		self.paletteIndex = {color: i for i, color in enumerate(self.palette)}
+		self.cells = self.makeGrid()
 		self.rooms = []
+		self.occupancy = Occupancy(x, y)
 		
 	# Creates a grid of x by y pixels, where the outermost layer is a black 1 pixel thick border
 	def makeGrid(self):
-	 	return [[ceil((x % (self.x-1))/(x+1)) % 2*ceil((y % (self.y-1))/(y+1)) % 2 == 1 and \
-	 		(225,225,225) or (0,0,0) for x in range(self.x)] for y in range(self.y)]
+		cells = np.full((self.y, self.x), FLOOR, dtype=np.uint8)
+		cells[0, :] = cells[-1, :] = cells[:, 0] = cells[:, -1] = WALL
+		return cells
+
+	# list of lists view of the cells, grid.grid[y][x] reads and writes RGB tuples
+	@property
+	def grid(self):
+		return GridView(self)
+
+	@grid.setter
+	def grid(self, rows):
+		if len(rows) != self.y or any(len(row) != self.x for row in rows):
+			raise BaseException(f'Grid.grid - The rows must be of size {self.x}x{self.y}.')
+		self.cells = np.array([[self.colorIndex(color) for color in row] for row in rows], dtype=np.uint8)
+
+	# returns the palette index of a color, adding it to the palette when it is new
+	def colorIndex(self, color):
+		index = self.paletteIndex.get(color)
+		if index is None:
+			if len(self.palette) > 255:
+				raise BaseException('Grid.colorIndex - A Grid cannot hold more than 256 colors.')
+			index = len(self.palette)
+			self.palette.append(color)
+			self.paletteIndex[color] = index
+		return index
+
+	# resolves the palette into a (y, x, 3) RGB array, only needed when rendering
+	def rgb(self):
+		return np.array(self.palette, dtype=np.uint8)[self.cells]
      
-	# generates n randomly sized rooms within grid 
-	def generateRooms(self, n, max_room_size = 5, filter=sum([0 | (1 << i) for i in range(0, len(ROOM_TYPES.keys()))])):
+	# generates up to n randomly sized rooms within grid, rejecting rooms that would overlap or sit within min_gap of another
+	def generateRooms(self, n, max_room_size = 5, filter=sum([0 | (1 << i) for i in range(0, len(ROOM_TYPES.keys()))]), min_gap = 0, fill_ratio = None, max_attempts = 30):
 		if type(n) != int or type(max_room_size) != int:
 			raise BaseException('Grid.generateRooms - The input "n" must be an int.')
 		if type(max_room_size) != int:
 			raise BaseException('Grid.generateRooms - The input "max_room_size" must be an int.')
 		if n < 1 or max_room_size < 1:
 			raise BaseException('Grid.generateRooms - The input "n" or "max_room_size" must be at least 1.')
+		if type(min_gap) != int or type(max_attempts) != int:
+			raise BaseException('Grid.generateRooms - The inputs "min_gap" and "max_attempts" must be ints.')
+		if min_gap < 0 or max_attempts < 1:
+			raise BaseException('Grid.generateRooms - The input "min_gap" must be at least 0 and "max_attempts" at least 1.')
+		if fill_ratio is not None and (type(fill_ratio) not in (int, float) or not 0 < fill_ratio <= 1):
+			raise BaseException('Grid.generateRooms - The input "fill_ratio" must be a number above 0 and at most 1.')
 
 		room_types = list()
 		for i in range (0, len(ROOM_TYPES)):
 			if filter & (1 << i):
-				room_types.append(list(ROOM_TYPES.keys())[i]) 
-		random.shuffle(room_types)
+				room_types.append(i) 
+		self.rng.shuffle(room_types)
 		
 		# If we need more rooms than types, allow duplicates
 		if n > len(room_types):
-			room_types.extend(random.choices(room_types, k=n - len(room_types)))
+			room_types.extend(self.rng.choices(room_types, k=n - len(room_types)))
 		
-		for i in range(n):
-			width = random.randint(2, max_room_size)
-			height = random.randint(2, max_room_size)
-			x = random.randint(1, self.x - width)
-			y = random.randint(1, self.y - height)
-			# Uses color from ROOM_TYPES
-			color = ROOM_TYPES[room_types[i]]['rgb']
-			self.rooms.insert(0, Room(x, y, width, height, color).place(self))
-    
+		# cells rooms may cover in total before stopping
+		target = fill_ratio is not None and fill_ratio*(self.x - 2)*(self.y - 2) or None
+		self.placement = {'requested': n, 'placed': 0, 'attempts': 0, 'fill': 0.0, 'exhausted': False, 'target_reached': False}
+		colors = [info['rgb'] for info in ROOM_TYPES.values()]
+		placed = []
+		with timed('rooms'):
+			for i in range(n):
+				if target is not None and self.occupancy.taken >= target:
+					self.placement['target_reached'] = True
+					break
+				for attempt in range(max_attempts):
+					width = self.rng.randint(2, max_room_size)
+					height = self.rng.randint(2, max_room_size)
+					x = self.rng.randint(1, self.x - width)
+					y = self.rng.randint(1, self.y - height)
+					if self.occupancy.fits(x, y, width, height, min_gap):
+						break
+				else:
+					# not even one of max_attempts candidates fit, the space left is used up
+					self.placement['attempts'] += max_attempts
+					self.placement['exhausted'] = True
+					break
+				self.placement['attempts'] += attempt + 1
+				self.occupancy.take(x, y, width, height)
+				# Uses color from ROOM_TYPES, the values were checked above so the room skips its own checks
+				room = Room.unchecked(x, y, width, height, colors[room_types[i]], room_types[i])
+				room.stamp(self)
+				placed.append(room)
+				self.placement['placed'] += 1
+		# newest rooms come first
+		self.rooms[:0] = reversed(placed)
+		self.placement['fill'] = self.occupancy.taken/((self.x - 2)*(self.y - 2))
+		return self.placement
     # generates a path with a set complexity ####
-	def generatePath(self, complexity = 1):
-		"""Generates the path"""
-		def carve_passages_from(x, y):
-			directions = [(0, 2), (2, 0), (0, -2), (-2, 0)]
-			random.shuffle(directions)
-			for dx, dy in directions:
-				nx, ny = x + dx, y + dy
-				if 0 < nx < self.x - 1 and 0 < ny < self.y - 1 and self.grid[ny][nx] != (0,0,0):
-					self.grid[y + dy // 2][x + dx // 2] = (0,0,0)
-					self.grid[ny][nx] = (0,0,0)
-					carve_passages_from(nx, ny)
-		def is_fully_connected(maze):
-			#Make sure there is no space not being reached from (1,1) start point
-			width, height = maze.x, maze.y
-			visited = set()
-			queue = deque([(1, 1)])
-			while queue:
-				x, y = queue.popleft()
-				if (x, y) in visited:
-					continue
-				visited.add((x, y))
-				for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-					nx, ny = x + dx, y + dy
-					if 0 <= nx < width and 0 <= ny < height and maze.grid[ny][nx] != (0,0,0) and (nx, ny) not in visited:
-						queue.append((nx, ny))
-			return all(maze.grid[y][x] != (0,0,0) or (x, y) in visited for y in range(height) for x in range(width))
-
-		#Fixes the maze by breaking walls to connect all regions. Ensure the connectivity of the whole maze
-		def ensure_connectivity(maze):
-			if is_fully_connected(maze):
-				print("Maze is already fully connected.")
-				return
-			width, height = maze.x, maze.y
-			queue = deque([(1, 1)])  # Start from entrance
-			visited = set(queue)
-			while queue:
-				x, y = queue.popleft()
-				for dx, dy in [(0, -1), (0, 1), (-1, 0), (1, 0)]:
-					nx, ny = x + dx, y + dy
-					if 0 <= nx < width and 0 <= ny < height and (nx, ny) not in visited:
-						if maze.grid[ny][nx] != (0,0,0):
-							queue.append((nx, ny))
-							visited.add((nx, ny))
-
-			# Identify isolated regions and connect them
-			for y in range(1, height - 1, 2):
-				for x in range(1, width - 1, 2):
-					if maze.grid[y][x] == (0,0,0) and (x, y) not in visited:
-						#print(f"Fixing connectivity at ({x}, {y})")
-						# Find a neighboring passage to connect to
-						directions = [(0, -1), (1, 0), (0, -1), (-1, 0)]
-						random.shuffle(directions)
-						for dx, dy in directions:
-							nx, ny = x + dx, y + dy
-							if maze.grid[ny][nx] == (225,225,225):  # Connect to an existing path
-								maze.grid[(y + ny) // 2][(x + nx) // 2] = (225,225,225)
-								queue.append((x, y))
-								visited.add((x, y))
-								break  # Stop after fixing one connection
-			
-		carve_passages_from(1, 1)
-		ensure_connectivity(self)
-		# Fix rooms
-		for topleft, bottomright, color in list(reversed(self.rooms)):
-			Room(topleft[0], topleft[1], bottomright[0] - topleft[0], bottomright[1] - topleft[1], color).place(self)
+	def generatePath(self, complexity = 1, blocks = 1, processes = None):
+		"""Generates the path, carving it as one piece or split into blocks carved by up to processes
+		processes at once. A seed carves a different maze for every number of blocks."""
+		if type(blocks) != int or blocks < 1:
+			raise BaseException('Grid.generatePath - The input "blocks" must be an int of at least 1.')
+		with timed('carve'):
+			if blocks > 1:
+				cells = self.cells.copy()
+				self.carving = carve_blocks(cells, self.x, self.y, self.rng, WALL, blocks, processes)
+				# the python loops below work on list copies of the cells, indexing numpy per cell is slow
+				flat = cells.ravel().tolist()
+			else:
+				flat = self.cells.ravel().tolist()
+				carve_passages(flat, self.x, self.y, 1, 1, self.rng, WALL)
+		# carving runs over the rooms, stamp them back before joining the open regions so they count as open
+		with timed('room_fix'):
+			for room in reversed(self.rooms):
+				row = [self.colorIndex(room.color)]*room.width
+				for y in range(room.y, room.y + room.height):
+					flat[y*self.x + room.x:y*self.x + room.x + room.width] = row
+		with timed('connectivity'):
+			self.connectivity = connect_regions(flat, self.x, self.y, self.rng, WALL, FLOOR)
+		self.cells = np.array(flat, dtype=np.uint8).reshape(self.y, self.x)
     
     # converts a rectangle from grid space into image space, then to a string
 	def toImageLocation(self, point1, point2) -> str:
@@ -192,44 +245,197 @@ class Grid:
 			variant == 'Text' and self.text() or \
 			None
 		
-	# displays the graph onto the screen
+	# displays the graph onto the screen, matplotlib is only loaded here as importing it is slow
 	def graph(self):
+		from matplotlib import pyplot
 		fig = pyplot.figure()
 		ax = pyplot.Axes(fig, [0., 0., 1., 1.])
 		ax.set_axis_off()
 		fig.add_axes(ax)
-		ax.imshow(self.grid)
+		ax.imshow(self.rgb())
 		fig.clear()
 		pass
 	
-	# converts the graph into an base64 image to be viewed on the web
-	def image(self):
-		fig = pyplot.figure()
-		ax = pyplot.Axes(fig, [0., 0., 1., 1.])
-		ax.set_axis_off()
-		fig.add_axes(ax)
-		ax.imshow(self.grid)
-		# Source: https://gitlab.com/-/snippets/1924163
-		pngImage = io.BytesIO()
-		FigureCanvas(fig).print_png(pngImage)
-		fig.clear()
-		return "data:image/png;base64," + base64.b64encode(pngImage.getvalue()).decode('utf8')
+	# converts the grid into a base64 png image to be viewed on the web, or the raw png bytes
+	def image(self, scale = None, raw = False):
+		pngImage = self.png(scale)
+		if raw:
+			return pngImage
+		return "data:image/png;base64," + base64.b64encode(pngImage).decode('utf8')
+
+	# encodes the grid as a palette png, fit onto the 640x480 canvas or with each cell as a scale by scale block
+	def png(self, scale = None):
+		if scale is None:
+			with timed('png'):
+				# the background takes the palette slot after the grid's colors
+				return encode_png(fit_cells(self.cells, len(self.palette)), self.palette + [BACKGROUND])
+		if type(scale) != int:
+			raise BaseException('Grid.png - The input "scale" must be an int.')
+		if scale < 1:
+			raise BaseException('Grid.png - The input "scale" must be at least 1.')
+		with timed('png'):
+			return encode_png(scale_cells(self.cells, scale), self.palette)
         
+	# encodes one tile of the grid's tile pyramid as a palette png, see render.tile_levels
+	def tile(self, z, tx, ty):
+		if type(z) != int or type(tx) != int or type(ty) != int:
+			raise BaseException('Grid.tile - The inputs "z", "tx" and "ty" must be ints.')
+		if z < 0 or z >= tile_levels(self.x, self.y):
+			raise BaseException(f'Grid.tile - The input "z" must be between 0 and {tile_levels(self.x, self.y) - 1}.')
+		across, down = tile_count(self.x, self.y, z)
+		if tx < 0 or tx >= across or ty < 0 or ty >= down:
+			raise BaseException(f'Grid.tile - Zoom level {z} only has {across}x{down} tiles.')
+		with timed('tile'):
+			return encode_png(tile_cells(self.cells, len(self.palette), z, tx, ty), self.palette + [BACKGROUND])
+
 	# saves the image as a png
-	def save(self):
-		pyplot.imsave('sample.png', self.grid)
+	def save(self, scale = None):
+		with open('sample.png', 'wb') as file:
+			file.write(self.png(scale))
 		
-	# textify
-	def text(self):
-		t = ""
-		for x in range(self.y):
-			for y in range(self.y):
-				t += colorToString(self.grid[x][y])
-			t += "\n"
-		return t
+	# packs the grid into bytes, one bit per cell for walls followed by a table of the rooms stamped over them
+	def serialize(self):
+		if not 0 <= self.seed < SEED_LIMIT:
+			raise BaseException('Grid.serialize - The seed must be at least 0 and below SEED_LIMIT to be serialized.')
+		data = [FORMAT_HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, GENERATOR_VERSION, self.x, self.y, self.seed, len(self.rooms))]
+		for room in self.rooms:
+			data.append(FORMAT_ROOM.pack(room.x, room.y, room.width, room.height, NO_TYPE if room.type_id is None else room.type_id, *room.color))
+		data.append(np.packbits(self.cells == WALL).tobytes())
+		data = b''.join(data)
+		return data + struct.pack('>I', zlib.crc32(data))
+
+	# rebuilds a Grid from the bytes of serialize, without generating anything
+	@classmethod
+	def deserialize(cls, data):
+		if type(data) not in (bytes, bytearray, memoryview):
+			raise BaseException('Grid.deserialize - The input "data" must be bytes.')
+		data = bytes(data)
+		if len(data) < FORMAT_HEADER.size + 4 or data[:4] != FORMAT_MAGIC:
+			raise BaseException('Grid.deserialize - The data is not a serialized Grid.')
+		if struct.unpack('>I', data[-4:])[0] != zlib.crc32(data[:-4]):
+			raise BaseException('Grid.deserialize - The data is corrupted.')
+		magic, version, generator, x, y, seed, count = FORMAT_HEADER.unpack_from(data)
+		if version != FORMAT_VERSION:
+			raise BaseException(f'Grid.deserialize - Format version {version} is not supported.')
+		walls = FORMAT_HEADER.size + count*FORMAT_ROOM.size
+		if len(data) != walls + (x*y + 7)//8 + 4:
+			raise BaseException('Grid.deserialize - The data does not match its header.')
+		grid = cls(x, y, seed)
+		grid.generator = generator
+		bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8, offset=walls, count=(x*y + 7)//8), count=x*y)
+		grid.cells = np.where(bits, WALL, FLOOR).astype(np.uint8).reshape(y, x)
+		for offset in range(FORMAT_HEADER.size, walls, FORMAT_ROOM.size):
+			rx, ry, width, height, type_id, *color = FORMAT_ROOM.unpack_from(data, offset)
+			grid.rooms.append(Room.unchecked(rx, ry, width, height, tuple(color), None if type_id == NO_TYPE else type_id))
+		# rooms are listed newest first, stamp them oldest first so overlaps come out the same
+		for room in reversed(grid.rooms):
+			room.stamp(grid)
+		return grid
+
+	# textify, with rooms each room is drawn with its room type's symbol
+	def text(self, rooms = False):
+		with timed('text'):
+			return render_text(self.cells, self.symbolTable(rooms))
+
+	# yields the lines of text() one row at a time, for grids too large to hold as one string
+	def textRows(self, rooms = False):
+		return text_rows(self.cells, self.symbolTable(rooms))
+
+	# the symbol of each palette color, rooms gets room types their ROOM_TYPES symbol instead of "_"
+	def symbolTable(self, rooms = False):
+		symbols = [colorToString(color) for color in self.palette]
+		if rooms:
+			for i, color in enumerate(self.palette):
+				if color in ROOM_TYPE_BY_RGB:
+					symbols[i] = ROOM_TYPES[ROOM_TYPE_NAMES[ROOM_TYPE_BY_RGB[color]]]['symbol']
+		return symbol_table(symbols)
+
+# Bitmap of the cells taken by rooms, one int of bits per row so a room is checked or taken with one mask per row
+class Occupancy:
+	def __init__(self, x, y):
+		self.rows = [0]*y
+		self.taken = 0
+
+	# whether a room fits without touching another room's cells, or coming within gap cells of one
+	def fits(self, x, y, width, height, gap = 0):
+		left = max(x - gap, 0)
+		mask = ((1 << (x + width + gap - left)) - 1) << left
+		for row in self.rows[max(y - gap, 0):y + height + gap]:
+			if row & mask:
+				return False
+		return True
+
+	def take(self, x, y, width, height):
+		mask = ((1 << width) - 1) << x
+		for i in range(y, y + height):
+			self.rows[i] |= mask
+		self.taken += width*height
+
+# List of lists compatibility view over a Grid's cells
+class GridView:
+	def __init__(self, grid):
+		self.source = grid
+
+	def __len__(self):
+		return self.source.y
+
+	def __getitem__(self, y):
+		if type(y) == slice:
+			return [GridRow(self.source, i) for i in range(*y.indices(self.source.y))]
+		return GridRow(self.source, y)
+
+	def __iter__(self):
+		return (GridRow(self.source, y) for y in range(self.source.y))
+
+	def __eq__(self, other):
+		try:
+			return len(other) == len(self) and all(row == other_row for row, other_row in zip(self, other))
+		except TypeError:
+			return NotImplemented
+
+	def __repr__(self):
+		return repr(self.tolist())
+
+	# copies the view into a plain list of lists of RGB tuples
+	def tolist(self):
+		palette = self.source.palette
+		return [[palette[i] for i in row] for row in self.source.cells.tolist()]
+
+# A single row of a GridView
+class GridRow:
+	def __init__(self, grid, y):
+		self.source = grid
+		self.cells = grid.cells[y]
+
+	def __len__(self):
+		return len(self.cells)
+
+	def __getitem__(self, x):
+		palette = self.source.palette
+		if type(x) == slice:
+			return [palette[i] for i in self.cells[x].tolist()]
+		return palette[self.cells[x]]
+
+	def __setitem__(self, x, color):
+		self.cells[x] = self.source.colorIndex(color)
+
+	def __iter__(self):
+		palette = self.source.palette
+		return (palette[i] for i in self.cells.tolist())
+
+	def __eq__(self, other):
+		try:
+			return len(other) == len(self) and list(self) == list(other)
+		except TypeError:
+			return NotImplemented
+
+	def __repr__(self):
+		return repr(list(self))
 
 # Class for Rooms
 class Room:
+	__slots__ = ('x', 'y', 'width', 'height', 'color', 'type_id')
+
 	# initializes room
 	def __init__(self, x, y, width, height, color=(0, 0, 0)):
 		if type(x) != int or type(y) != int or type(width) != int or type(height) != int:
@@ -252,15 +458,36 @@ class Room:
 		self.width = width
 		self.height = height
 		self.color = color
+		# index into ROOM_TYPES, None for colors that are not a room type
+		self.type_id = ROOM_TYPE_BY_RGB.get(color)
+
+	# builds a room from values the caller has already checked, skipping the checks in __init__
+	@classmethod
+	def unchecked(cls, x, y, width, height, color, type_id):
+		room = cls.__new__(cls)
+		room.x = x
+		room.y = y
+		room.width = width
+		room.height = height
+		room.color = color
+		room.type_id = type_id
+		return room
+
+	# unpacks as the [topleft, bottomright, color] rooms used to be stored as
+	def __iter__(self):
+		return iter(((self.x, self.y), (self.x + self.width, self.y + self.height), self.color))
+
+	def __repr__(self):
+		return f'Room({self.x}, {self.y}, {self.width}, {self.height}, {self.color})'
 		
 	# places generated rooms onto grid
 	def place(self, grid):
 		if type(grid) != Grid:
 			raise BaseException('Room.place - Room must be placed within a Grid object.')
-		# reminder to make sure that the values for x, y, width, height are within the bounds of the Grid object
-		max_y, max_x = grid.y, grid.x  # get grid dimensions
-		for i in range(self.y, self.y + self.height):
-			for j in range(self.x, self.x + self.width):
-				if 0 <= i < max_y and 0 <= j < max_x:  #  ensure within bounds
-					grid.grid[i][j] = self.color
-		return [(self.x, self.y), (self.x + self.width, self.y + self.height), self.color]      
+		self.stamp(grid)
+		return [(self.x, self.y), (self.x + self.width, self.y + self.height), self.color]
+
+	# writes the room into grid's cells, without checking grid
+	def stamp(self, grid):
+		# slicing clips the room to the bounds of the grid
+		grid.cells[self.y:self.y + self.height, self.x:self.x + self.width] = grid.colorIndex(self.color)
@@ -0,0 +1,175 @@
+"""
+	Generates mazes in a pool of worker processes, so a large maze does not
+	hold up every other request while it is built. A job is submitted with
+	the maze parameters and handed back an id straight away, its stage is
+	then polled until the rendered maze is ready. Given a table, jobs are
+	also kept where every worker process can read them, so a maze is only
+	built once and any worker can answer for it.
+"""
+import multiprocessing
+import os
+import secrets
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from cache import LRUCache
+from forge import generate_image, grab_map, parse_maze_args
+
+# Stages a job goes through, in order, failed can replace any of them
+STAGES = ('queued', 'generating', 'describing', 'rendering', 'done')
+# seconds before a job that has not finished is taken to have been lost with its process, and is built again
+JOB_TIMEOUT = 600
+# seconds a finished job is kept in the table, so other processes can read its maze back
+JOB_KEEP = 3600
+
+# set in each worker process by set_progress
+progress = None
+
+def set_progress(queue):
+	global progress
+	progress = queue
+	# a worker process is forked from the server, whose handlers would only tell its own greenlets to stop
+	signal.signal(signal.SIGTERM, signal.SIG_DFL)
+	signal.signal(signal.SIGINT, signal.SIG_DFL)
+
+def build(job_id, x, y, seed, args):
+	"""Runs in a worker process, generating a maze and reporting each stage it reaches.
+	Returns the serialized Grid, its png and its rooms."""
+	progress.put((job_id, 'generating'))
+	sampleGrid = generate_image(x, y, seed, **parse_maze_args(x, y, args))
+	progress.put((job_id, 'describing'))
+	maze = grab_map(sampleGrid)
+	progress.put((job_id, 'rendering'))
+	return {'grid': sampleGrid.serialize(), 'image': sampleGrid.image(raw=True), 'maze': maze}
+
+# Class for one submitted maze
+class Job:
+	__slots__ = ('id', 'key', 'stage', 'result', 'error', 'submitted', 'finished')
+
+	def __init__(self, key):
+		self.id = secrets.token_urlsafe(12)
+		self.key = key
+		self.stage = 'queued'
+		self.result = None
+		self.error = None
+		self.submitted = time.time()
+		self.finished = None
+
+	# rebuilds a Job from its row in a JobTable, it may have been run by another process
+	@classmethod
+	def from_row(cls, row):
+		job_id, x, y, seed, args, stage, error, submitted, finished, grid, image, maze = row
+		job = cls((x, y, seed, args))
+		job.id = job_id
+		job.stage = stage
+		job.error = error
+		job.submitted = submitted
+		job.finished = finished
+		if stage == 'done':
+			job.result = {'grid': grid, 'image': image, 'maze': maze}
+		return job
+
+	# what the status endpoint reports
+	def status(self):
+		status = {'id': self.id, 'stage': self.stage, 'step': STAGES.index(self.stage) if self.stage in STAGES else None, 'steps': len(STAGES)}
+		if self.error is not None:
+			status['error'] = self.error
+		if self.finished is not None:
+			status['seconds'] = round(self.finished - self.submitted, 3)
+		return status
+
+# Class for the pool of processes and the jobs it has been given
+class JobQueue:
+	def __init__(self, workers = None, on_done = None, max_jobs = 1024, table = None):
+		if workers is not None and (type(workers) != int or workers < 1):
+			raise BaseException('JobQueue() - The input "workers" must be an int of at least 1.')
+		self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+		# called with the job once its result is in, from the pool's own thread
+		self.on_done = on_done
+		self.jobs = LRUCache(max_entries=max_jobs)
+		self.running = {} # key -> job, so the same maze is only built once at a time
+		# a database.JobTable shared with the other processes, or None to keep jobs in this one
+		self.table = table
+		self.lock = threading.Lock()
+		self.pool = None
+
+	# the pool and the thread reading progress are only started by the first job
+	def start(self):
+		self.progress = multiprocessing.Queue()
+		self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=set_progress, initargs=(self.progress,))
+		threading.Thread(target=self.follow, daemon=True).start()
+
+	def follow(self):
+		while True:
+			try:
+				job_id, stage = self.progress.get()
+			except (EOFError, OSError):
+				# the queue is closed once the pool has shut down and the process is exiting
+				return
+			job = self.jobs.get(job_id)
+			# a late report must not move a finished job back, finish marks it under the same lock
+			with self.lock:
+				if job is not None and job.finished is None:
+					job.stage = stage
+			if self.table is not None:
+				self.table.set_stage(job_id, stage)
+
+	def submit(self, x, y, seed, args = ""):
+		"""Queues a maze, returning its Job, or the job already building the same maze.
+		With a table, that job may be another process', or one that is already done with its result."""
+		key = (x, y, seed, args)
+		with self.lock:
+			job = self.running.get(key)
+			if job is not None:
+				return job
+			job = Job(key)
+			if self.table is not None:
+				now = time.time()
+				row = self.table.claim(job, now - JOB_TIMEOUT, now - JOB_KEEP)
+				if row is not None:
+					return Job.from_row(row)
+			if self.pool is None:
+				self.start()
+			self.jobs.put(job.id, job)
+			self.running[key] = job
+		try:
+			future = self.pool.submit(build, job.id, x, y, seed, args)
+		except BrokenProcessPool:
+			# one of its processes was killed, so the pool takes no more jobs and is replaced
+			with self.lock:
+				self.start()
+			future = self.pool.submit(build, job.id, x, y, seed, args)
+		future.add_done_callback(lambda future: self.finish(job, future))
+		return job
+
+	def finish(self, job, future):
+		stage = 'done'
+		try:
+			job.result = future.result()
+			if self.on_done is not None:
+				self.on_done(job)
+		except BaseException as e:
+			job.error = str(e)
+			stage = 'failed'
+		# finished goes first so follow drops any report still on its way in
+		with self.lock:
+			job.finished = time.time()
+			job.stage = stage
+			# the table is updated before the maze stops counting as running, so it cannot be claimed again in between
+			if self.table is not None:
+				self.table.finish(job)
+			self.running.pop(job.key, None)
+
+	def get(self, job_id):
+		job = self.jobs.get(job_id)
+		if job is None and self.table is not None:
+			row = self.table.get(job_id)
+			if row is not None:
+				job = Job.from_row(row)
+		return job
+
+	def shutdown(self):
+		if self.pool is not None:
+			self.pool.shutdown(cancel_futures=True)
@@ -1,21 +1,131 @@
 """
-	Whether we are testing or not, when testing we can change main.py, 
-	app.py, and any of the template html files and they will 
+	Whether we are testing or not, when testing we can change main.py,
+	app.py, and any of the template html files and they will
 	automatically update the page when you refresh.
+
+	Run "python main.py --workers N" to serve with N worker processes
+	sharing one listening socket. The app is imported once before they are
+	forked, send the main process SIGHUP to restart the workers gracefully.
 """
 DEBUG = False
 
-from app import app
+import argparse
+import os
+import signal
+import socket
+import time
+
+from app import app, db, job_queue
+import database
 
 addr = '127.0.0.1'
 port = 8080
+# seconds a stopping worker is given to finish the requests it is serving
+GRACE = 10
+# a worker that exits sooner than this after starting is restarted after a pause, so a broken worker cannot fork in a loop
+MIN_UPTIME = 1
 
-if not DEBUG:
+# serves app on listener until the process is told to stop
+def serve(listener):
+	import gevent
+	import gevent.socket
 	from gevent.pywsgi import WSGIServer
-	print(f'Starting application, open url: http://{addr}:{port}')
-	http_server = WSGIServer((addr, port), app)
+	if isinstance(listener, socket.socket):
+		# gevent only waits on its own sockets, a plain one would block the whole worker in accept
+		listener = gevent.socket.socket(fileno=listener.detach())
+	http_server = WSGIServer(listener, app)
+	# stop() waits for requests in flight, so it cannot run inside the signal callback itself
+	gevent.signal_handler(signal.SIGTERM, lambda: gevent.spawn(http_server.stop, GRACE))
+	gevent.signal_handler(signal.SIGINT, lambda: gevent.spawn(http_server.stop, GRACE))
 	http_server.serve_forever()
-else:
-	import test # will run all tests EACH time you edit a .py file.
-	app.run(debug=True, host= addr, port=port)
-	# code will NOT run past here, think of above code like a while true do loop.
\ No newline at end of file
+
+# forks a worker serving on listener, returning its pid in the main process
+def spawn(listener):
+	pid = os.fork()
+	if pid == 0:
+		# the main process' signal handlers must not run in the worker
+		signal.signal(signal.SIGHUP, signal.SIG_DFL)
+		code = 0
+		try:
+			serve(listener)
+		except BaseException:
+			code = 1
+			raise
+		finally:
+			try:
+				# the job pool's processes were forked from this worker and would outlive it, the builds they have started are finished first
+				job_queue.shutdown()
+			finally:
+				# skips the main process' atexit handlers, which the worker has inherited
+				os._exit(code)
+	return pid
+
+def prefork(workers):
+	"""Runs workers processes serving on one socket, restarting any that exit, until SIGTERM or SIGINT."""
+	listener = socket.create_server((addr, port), backlog=2048)
+	# every worker waits on the socket, those that lose the race for a connection must not block
+	listener.setblocking(False)
+	# connections opened while importing app cannot be shared between processes, each worker opens its own
+	database.pool.close()
+	with app.app_context():
+		db.engine.dispose()
+
+	signals = []
+	for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+		signal.signal(signum, lambda signum, frame: signals.append(signum))
+
+	started = {} # pid -> when it was forked
+	for _ in range(workers):
+		started[spawn(listener)] = time.monotonic()
+	print(f'Started {workers} workers (pids {", ".join(map(str, started))}), open url: http://{addr}:{port}')
+
+	stopping = False
+	while started:
+		while signals:
+			signum = signals.pop(0)
+			if signum == signal.SIGHUP and not stopping:
+				# new workers start taking connections before the old ones stop accepting them
+				print('Restarting workers')
+				old = list(started)
+				for _ in old:
+					started[spawn(listener)] = time.monotonic()
+				for pid in old:
+					os.kill(pid, signal.SIGTERM)
+			elif signum != signal.SIGHUP and not stopping:
+				print('Stopping workers')
+				stopping = True
+				for pid in started:
+					os.kill(pid, signal.SIGTERM)
+		pid, status = os.waitpid(-1, os.WNOHANG)
+		if pid == 0:
+			time.sleep(0.1)
+			continue
+		if pid not in started:
+			continue
+		uptime = time.monotonic() - started.pop(pid)
+		# workers that were told to stop are already replaced, only unexpected exits are
+		if not stopping and os.waitstatus_to_exitcode(status) != 0:
+			print(f'Worker {pid} exited with code {os.waitstatus_to_exitcode(status)}, restarting it')
+			if uptime < MIN_UPTIME:
+				time.sleep(MIN_UPTIME)
+			started[spawn(listener)] = time.monotonic()
+	listener.close()
+
+if __name__ == '__main__':
+	parser = argparse.ArgumentParser(description='Serves Forgeon.')
+	parser.add_argument('--workers', type=int, default=1, help='worker processes to serve with, each uses its own core')
+	args = parser.parse_args()
+	if args.workers < 1:
+		parser.error('--workers must be at least 1')
+
+	if DEBUG:
+		import test # will run all tests EACH time you edit a .py file.
+		app.run(debug=True, host= addr, port=port)
+		# code will NOT run past here, think of above code like a while true do loop.
+	elif args.workers > 1 and hasattr(os, 'fork'):
+		prefork(args.workers)
+	else:
+		if args.workers > 1:
+			print('Worker processes need os.fork, serving from this process only')
+		print(f'Starting application, open url: http://{addr}:{port}')
+		serve((addr, port))
@@ -0,0 +1,89 @@
+"""
+	Timing instrumentation for the maze pipeline, exposed in the Prometheus
+	text format. Set the environment variable FORGEON_METRICS=0 to turn it
+	off, timed() then hands back a shared object that does nothing. Each
+	worker process of main.py counts on its own, so every sample is labelled
+	with the pid of the worker that answered instead of one worker's counts
+	seeming to jump to another's.
+"""
+import os
+import time
+from bisect import bisect_left
+
+ENABLED = os.environ.get('FORGEON_METRICS', '1') != '0'
+# upper bounds in seconds, a final +Inf bucket is implied
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Class for a histogram of observed values, kept separately per label
+class Histogram:
+	def __init__(self, name, description, label, buckets = BUCKETS):
+		self.name = name
+		self.description = description
+		self.label = label
+		self.buckets = buckets
+		self.series = {} # label value -> [bucket counts..., sum]
+
+	def observe(self, value, amount):
+		series = self.series.get(value)
+		if series is None:
+			series = self.series[value] = [0]*(len(self.buckets) + 2)
+		series[bisect_left(self.buckets, amount)] += 1
+		series[-1] += amount
+
+	# the histogram in the Prometheus text format, labels are put in front of each series' own
+	def lines(self, labels = ''):
+		yield f'# HELP {self.name} {self.description}'
+		yield f'# TYPE {self.name} histogram'
+		for value, series in sorted(self.series.items()):
+			label = f'{labels}{self.label}="{value}"'
+			total = 0
+			for bound, count in zip(self.buckets + ('+Inf',), series):
+				total += count
+				yield f'{self.name}_bucket{{{label},le="{bound}"}} {total}'
+			yield f'{self.name}_sum{{{label}}} {series[-1]}'
+			yield f'{self.name}_count{{{label}}} {total}'
+
+STAGE_SECONDS = Histogram('forgeon_stage_seconds', 'Time spent in each stage of generating and serving a maze.', 'stage')
+
+# Times the block it wraps into STAGE_SECONDS
+class Timer:
+	__slots__ = ('stage', 'start')
+
+	def __init__(self, stage):
+		self.stage = stage
+
+	def __enter__(self):
+		self.start = time.perf_counter()
+		return self
+
+	def __exit__(self, *exc):
+		STAGE_SECONDS.observe(self.stage, time.perf_counter() - self.start)
+		return False
+
+# Stands in for a Timer while metrics are off
+class NullTimer:
+	__slots__ = ()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, *exc):
+		return False
+
+NULL_TIMER = NullTimer()
+
+# use as "with timed('carve'):" around a stage
+def timed(stage):
+	return Timer(stage) if ENABLED else NULL_TIMER
+
+# the label of the worker process answering, read on each call since workers are forked after import
+def worker_label():
+	return f'worker="{os.getpid()}"'
+
+# a single counter or gauge in the Prometheus text format
+def sample(name, kind, description, value):
+	return f'# HELP {name} {description}\n# TYPE {name} {kind}\n{name}{{{worker_label()}}} {value}\n'
+
+# every metric in the Prometheus text format
+def render():
+	return ''.join(line + '\n' for line in STAGE_SECONDS.lines(worker_label() + ','))
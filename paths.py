@@ -0,0 +1,311 @@
+import os
+import random
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import permutations
+from math import isqrt
+from multiprocessing import shared_memory
+import numpy as np
+
+# Offsets to the next passage cell, in the order they are shuffled in
+STEPS = [(0, 2), (2, 0), (0, -2), (-2, 0)]
+# Every order the four steps can be shuffled into, so a stack frame only has to store an index
+ORDERS = list(permutations(range(4)))
+ORDER_INDEX = {order: i for i, order in enumerate(ORDERS)}
+
+def carve_passages(cells, width, height, x, y, rng, fill, carvable = None):
+	"""Depth first carving from (x, y) over a flat, row major list of cells.
+
+	Neighbours two cells away are entered when they are not yet `fill`, or when they are
+	`carvable` if given, and both they and the cell between are set to `fill`. Uses an
+	explicit stack instead of recursion, drawing from `rng` in the same order as the
+	recursive version so a seed carves the same maze."""
+	order = [0, 1, 2, 3]
+	rng.shuffle(order)
+	# each frame packs the cell index, the shuffled order and how many steps were tried
+	stack = [((y*width + x) << 7) | (ORDER_INDEX[tuple(order)] << 2)]
+	while stack:
+		frame = stack[-1]
+		index = frame >> 7
+		tried = frame & 3
+		y, x = divmod(index, width)
+		steps = ORDERS[(frame >> 2) & 31]
+		while tried < 4:
+			dx, dy = STEPS[steps[tried]]
+			tried += 1
+			nx, ny = x + dx, y + dy
+			if 0 < nx < width - 1 and 0 < ny < height - 1:
+				n = ny*width + nx
+				if (cells[n] == carvable) if carvable is not None else (cells[n] != fill):
+					cells[index + (dy // 2)*width + dx // 2] = fill
+					cells[n] = fill
+					if tried < 4:
+						stack[-1] = (frame & ~3) | tried
+					else:
+						stack.pop()
+					order = [0, 1, 2, 3]
+					rng.shuffle(order)
+					stack.append((n << 7) | (ORDER_INDEX[tuple(order)] << 2))
+					break
+		else:
+			stack.pop()
+
+def block_layout(width, height, blocks):
+	"""Splits the lattice carve_passages works on into at most `blocks` rectangles, as close to
+	square as the count allows. Returns the (x0, y0, x1, y1) edges of each block in row major
+	order and how many blocks there are across and down. Neighbouring blocks share the even
+	column or row between them, which neither of them carves."""
+	columns = len(range(1, width - 1, 2))
+	rows = len(range(1, height - 1, 2))
+	down = max(d for d in range(1, isqrt(blocks) + 1) if blocks % d == 0)
+	across = blocks // down
+	# the longer side of the grid is cut into more blocks
+	if (width >= height) != (across >= down):
+		across, down = down, across
+	across, down = min(across, columns), min(down, rows)
+	xs = [2*(columns*i//across) for i in range(across)] + [width - 1]
+	ys = [2*(rows*j//down) for j in range(down)] + [height - 1]
+	return [(xs[i], ys[j], xs[i + 1], ys[j + 1]) for j in range(down) for i in range(across)], across, down
+
+def carve_block(task):
+	"""Carves one block of a grid held in shared memory, run in a worker process by carve_blocks."""
+	name, width, height, (x0, y0, x1, y1), seed, fill = task
+	memory = shared_memory.SharedMemory(name=name)
+	try:
+		block = np.ndarray((height, width), dtype=np.uint8, buffer=memory.buf)[y0:y1 + 1, x0:x1 + 1]
+		w, h = x1 - x0 + 1, y1 - y0 + 1
+		flat = block.ravel().tolist()
+		# carve_passages leaves its first cell to be entered again later, a block of one cell would stay uncarved
+		flat[w + 1] = fill
+		carve_passages(flat, w, h, 1, 1, random.Random(seed), fill)
+		# only the inside is written back, the edges belong to the neighbouring blocks too
+		block[1:-1, 1:-1] = np.array(flat, dtype=np.uint8).reshape(h, w)[1:-1, 1:-1]
+		# the view has to go before the memory can be closed
+		del block
+	finally:
+		memory.close()
+
+def carve_blocks(cells, width, height, rng, fill, blocks, processes = None):
+	"""Carves a (height, width) uint8 array in place like carve_passages, split into blocks that
+	are carved at the same time by a pool of processes sharing the array's memory.
+
+	Every block gets its own seed from `rng`, then the blocks are stitched along a random spanning
+	tree by opening one cell of the edge between each pair of blocks in it, so the carved cells
+	stay a single tree. The maze depends on the seed and the number of blocks, never on how many
+	processes carved them. Returns how many blocks were carved and how many edges were opened."""
+	layout, across, down = block_layout(width, height, blocks)
+	seeds = [rng.getrandbits(64) for _ in layout]
+	memory = shared_memory.SharedMemory(create=True, size=width*height)
+	try:
+		shared = np.ndarray((height, width), dtype=np.uint8, buffer=memory.buf)
+		shared[:] = cells
+		tasks = [(memory.name, width, height, edges, seed, fill) for edges, seed in zip(layout, seeds)]
+		processes = min(len(tasks), processes or os.cpu_count() or 1)
+		if processes == 1:
+			for task in tasks:
+				carve_block(task)
+		else:
+			with ProcessPoolExecutor(max_workers=processes) as pool:
+				list(pool.map(carve_block, tasks))
+		cells[:] = shared
+		del shared
+	finally:
+		memory.close()
+		memory.unlink()
+
+	# pairs of neighbouring blocks, with whether they sit side by side
+	pairs = [(b, b + 1, True) for b in range(len(layout)) if (b + 1) % across]
+	pairs += [(b, b + across, False) for b in range(len(layout) - across)]
+	rng.shuffle(pairs)
+	parent = list(range(len(layout)))
+	opened = 0
+	for a, b, beside in pairs:
+		ra, rb = find(parent, a), find(parent, b)
+		if ra == rb:
+			continue
+		parent[ra] = rb
+		x0, y0, x1, y1 = layout[a]
+		if beside:
+			cells[y0 + 1 + 2*rng.randrange(len(range(y0 + 1, y1, 2))), x1] = fill
+		else:
+			cells[y1, x0 + 1 + 2*rng.randrange(len(range(x0 + 1, x1, 2)))] = fill
+		opened += 1
+	return {'blocks': len(layout), 'openings': opened}
+
+def label_runs(cells, width, height, wall):
+	"""Labels the open regions of a flat, row major list of cells.
+
+	Horizontal runs of open cells are numbered with numpy, then runs that touch vertically
+	are joined in a disjoint set. Returns the run number of every cell (0 for walls) as a
+	(height, width) array, the disjoint set's parent list and the number of regions."""
+	grid = np.array(cells).reshape(height, width)
+	passable = grid != wall
+	starts = passable.copy()
+	starts[:, 1:] &= ~passable[:, :-1]
+	runs = np.cumsum(starts.ravel()).reshape(height, width)*passable
+	count = int(runs.max())
+	parent = list(range(count + 1))
+	touching = passable[1:] & passable[:-1]
+	pairs = np.unique(runs[1:][touching].astype(np.int64)*(count + 1) + runs[:-1][touching])
+	regions = count
+	for a, b in zip(*(half.tolist() for half in np.divmod(pairs, count + 1))):
+		a, b = find(parent, a), find(parent, b)
+		if a != b:
+			parent[a] = b
+			regions -= 1
+	return runs, parent, regions
+
+def find(parent, i):
+	while parent[i] != i:
+		parent[i] = parent[parent[i]]
+		i = parent[i]
+	return i
+
+def connect_regions(cells, width, height, rng, wall, floor):
+	"""Joins every open region of a flat, row major list of cells into one.
+
+	Cells that are not `wall` are open. Regions are labelled in one pass by label_runs,
+	then merged Kruskal style by turning single wall cells that sit between two
+	different regions into `floor`, in an order shuffled by `rng`. Regions that no
+	single wall separates are joined along the shortest path of walls instead.
+	Returns how many regions there were, how many were joined and how many walls broke."""
+	runs, parent, regions = label_runs(cells, width, height, wall)
+	report = {'regions': regions, 'repaired': 0, 'walls_broken': 0}
+	if regions <= 1:
+		return report
+
+	# single walls with open cells on opposite sides, keyed by the pair of regions they join
+	roots = np.array(parent)
+	while True:
+		jumped = roots[roots]
+		if np.array_equal(jumped, roots):
+			break
+		roots = jumped
+	inner = runs[1:-1, 1:-1] == 0
+	left, right = roots[runs[1:-1, :-2]], roots[runs[1:-1, 2:]]
+	up, down = roots[runs[:-2, 1:-1]], roots[runs[2:, 1:-1]]
+	across = inner & (left > 0) & (right > 0) & (left != right)
+	along = inner & (up > 0) & (down > 0) & (up != down) & ~across
+	first = np.where(across, np.minimum(left, right), np.minimum(up, down))
+	second = np.where(across, np.maximum(left, right), np.maximum(up, down))
+	walls = np.flatnonzero(across | along)
+	keys = first.ravel()[walls].astype(np.int64)*len(parent) + second.ravel()[walls]
+	order = np.argsort(keys, kind='stable')
+	walls, keys = walls[order], keys[order]
+	bounds = np.flatnonzero(np.diff(keys)) + 1
+	starts = [0] + bounds.tolist() if len(walls) else []
+	ends = bounds.tolist() + [len(walls)]
+	# one randomly picked wall per pair of regions, tried in a shuffled order
+	picks = [walls[start + rng.randrange(end - start)] for start, end in zip(starts, ends)]
+	rng.shuffle(picks)
+	ys, xs = np.divmod(np.array(picks, dtype=np.int64), width - 2)
+	candidates = ((ys + 1)*width + xs + 1).tolist()
+	flat_runs = runs.ravel()
+	remaining = regions
+	for i in candidates:
+		if remaining == 1:
+			break
+		neighbours = {find(parent, int(flat_runs[n])) for n in (i - 1, i + 1, i - width, i + width) if flat_runs[n]}
+		if len(neighbours) < 2:
+			continue
+		cells[i] = floor
+		report['walls_broken'] += 1
+		root = neighbours.pop()
+		for other in neighbours:
+			parent[other] = root
+		remaining -= len(neighbours)
+
+	while remaining > 1:
+		opened = bridge(cells, width, height, flat_runs.tolist(), parent, wall, floor)
+		if not opened:
+			break
+		report['walls_broken'] += opened
+		runs, parent, remaining = label_runs(cells, width, height, wall)
+		flat_runs = runs.ravel()
+	report['repaired'] = regions - remaining
+	return report
+
+def bridge(cells, width, height, runs, parent, wall, floor):
+	"""Opens the shortest run of walls from the region of the first open cell to any other region.
+	Returns how many walls were opened."""
+	start = next(i for i, run in enumerate(runs) if run)
+	root = find(parent, runs[start])
+	previous = {i: None for i, run in enumerate(runs) if run and find(parent, run) == root}
+	queue = deque(previous)
+	while queue:
+		i = queue.popleft()
+		y, x = divmod(i, width)
+		for n, inside in ((i - 1, x > 1), (i + 1, x < width - 2), (i - width, y > 1), (i + width, y < height - 2)):
+			if not inside or n in previous:
+				continue
+			previous[n] = i
+			if runs[n]:
+				# reached another region, open the walls walked through
+				opened = 0
+				i = previous[n]
+				while cells[i] == wall:
+					cells[i] = floor
+					opened += 1
+					i = previous[i]
+				return opened
+			queue.append(n)
+	return 0
+
+def eller_rows(width, height, rng, fill, empty):
+	"""Yields a perfect maze one row at a time as uint8 arrays of `width` cells, so memory grows
+	with the width alone and the first rows are ready before the last are made.
+
+	The rows follow the lattice and colours of a Grid carved by carve_passages: the one cell
+	border and the passages are `fill`, and everything else is `empty`. Passage cells sit at
+	odd x and y, with neighbours joined through the cell between them.
+	Eller's algorithm keeps only the set of each cell in the current row: neighbours in
+	different sets are joined at random, every set carries at least one cell down to the
+	next row, and the last row joins whatever sets are left, so every passage cell is reached
+	by exactly one path."""
+	columns = len(range(1, width - 1, 2))
+	rows = len(range(1, height - 1, 2))
+	sets = [0]*columns # 0 for a cell that no set has reached yet
+	members = {} # set -> its cells in the current row
+	fresh = 1
+	inside = np.full(width, empty, dtype=np.uint8)
+	inside[0] = inside[-1] = fill
+	yield np.full(width, fill, dtype=np.uint8)
+	for r in range(rows):
+		last = r == rows - 1
+		for i in range(columns):
+			if not sets[i]:
+				sets[i] = fresh
+				members[fresh] = [i]
+				fresh += 1
+		row = inside.copy()
+		row[1:2*columns:2] = fill
+		for i in range(columns - 1):
+			a, b = sets[i], sets[i + 1]
+			if a != b and (last or rng.random() < 0.5):
+				row[2*i + 2] = fill
+				# the smaller set is relabelled, so merging a whole row stays close to linear
+				if len(members[a]) < len(members[b]):
+					a, b = b, a
+				for j in members[b]:
+					sets[j] = a
+				members[a].extend(members.pop(b))
+		yield row
+		if last:
+			break
+		below = inside.copy()
+		carried = [0]*columns
+		for s, cells in members.items():
+			down = [j for j in cells if rng.random() < 0.5] or [rng.choice(cells)]
+			for j in down:
+				carried[j] = s
+				below[2*j + 1] = fill
+		sets = carried
+		members = {}
+		for j, s in enumerate(sets):
+			if s:
+				members.setdefault(s, []).append(j)
+		yield below
+	# an even height leaves a row below the last passages before the border
+	for _ in range(height - 2*rows - 1):
+		yield inside.copy()
+	yield np.full(width, fill, dtype=np.uint8)
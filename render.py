@@ -0,0 +1,131 @@
+import struct
+import zlib
+import numpy as np
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# size of the canvas the maze is fit onto when no scale is given, matching Grid.toImageLocation
+CANVAS_WIDTH = 640
+CANVAS_HEIGHT = 480
+# color of the canvas around a fitted maze
+BACKGROUND = (255, 255, 255)
+
+# wraps data into a PNG chunk with its length and checksum
+def chunk(kind, data):
+	return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+def encode_png(indexes, palette, level = 6):
+	"""Encodes a 2D uint8 array of palette indexes as an 8 bit palette PNG, returning its bytes."""
+	if len(palette) > 256:
+		raise BaseException('encode_png - The palette cannot hold more than 256 colors.')
+	height, width = indexes.shape
+	# every scanline starts with its filter type, 0 leaves the row as is
+	scanlines = np.zeros((height, width + 1), dtype=np.uint8)
+	scanlines[:, 1:] = indexes
+	return PNG_SIGNATURE + \
+		chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)) + \
+		chunk(b'PLTE', bytes(channel for color in palette for channel in color)) + \
+		chunk(b'IDAT', zlib.compress(scanlines.tobytes(), level)) + \
+		chunk(b'IEND', b'')
+
+# compressed bytes gathered into each IDAT chunk of a streamed png
+IDAT_SIZE = 65536
+
+def encode_png_rows(rows, width, height, palette, scale = 1, level = 6):
+	"""Encodes rows of width palette indexes as an 8 bit palette PNG with each cell as a scale by scale
+	block, yielding its bytes as they are ready. Only one row is held at a time, so the rows can come
+	straight from a generator, but the height has to be known up front for the header."""
+	if len(palette) > 256:
+		raise BaseException('encode_png_rows - The palette cannot hold more than 256 colors.')
+	yield PNG_SIGNATURE + \
+		chunk(b'IHDR', struct.pack('>IIBBBBB', width*scale, height*scale, 8, 3, 0, 0, 0)) + \
+		chunk(b'PLTE', bytes(channel for color in palette for channel in color))
+	compressor = zlib.compressobj(level)
+	pending = []
+	size = 0
+	count = 0
+	for row in rows:
+		if len(row) != width:
+			raise BaseException(f'encode_png_rows - Row {count} has {len(row)} cells instead of {width}.')
+		# every scanline starts with its filter type, 0 leaves the row as is
+		scanline = b'\x00' + np.asarray(row, dtype=np.uint8).repeat(scale).tobytes()
+		for _ in range(scale):
+			data = compressor.compress(scanline)
+			pending.append(data)
+			size += len(data)
+		count += 1
+		if size >= IDAT_SIZE:
+			yield chunk(b'IDAT', b''.join(pending))
+			pending = []
+			size = 0
+	if count != height:
+		raise BaseException(f'encode_png_rows - Expected {height} rows but got {count}.')
+	pending.append(compressor.flush())
+	yield chunk(b'IDAT', b''.join(pending)) + chunk(b'IEND', b'')
+
+# repeats every cell into a scale by scale block of pixels
+def scale_cells(cells, scale):
+	return cells.repeat(scale, axis=0).repeat(scale, axis=1)
+
+def fit_cells(cells, background, width = CANVAS_WIDTH, height = CANVAS_HEIGHT):
+	"""Fits the cells onto a width by height canvas keeping their aspect ratio, centering them
+	and filling the rest with the background index. Each pixel takes the cell under its center."""
+	rows, columns = cells.shape
+	a = min(height*columns/rows, width)
+	b = min(width*rows/columns, height)
+	column = np.floor((np.arange(width) + 0.5 - (width - a)/2)*columns/a).astype(np.intp)
+	row = np.floor((np.arange(height) + 0.5 - (height - b)/2)*rows/b).astype(np.intp)
+	canvas = cells[np.clip(row, 0, rows - 1)[:, None], np.clip(column, 0, columns - 1)[None, :]]
+	canvas[(row < 0) | (row >= rows), :] = background
+	canvas[:, (column < 0) | (column >= columns)] = background
+	return canvas
+
+# width and height of a tile in pixels
+TILE_SIZE = 256
+# at the deepest zoom level each cell is at least this many pixels wide
+TILE_CELL_PIXELS = 16
+
+def tile_levels(columns, rows):
+	"""The zoom levels of a maze's tile pyramid. Level 0 fits the whole maze in one tile and
+	each level after it doubles the size, until a cell covers TILE_CELL_PIXELS pixels."""
+	levels = 1
+	while TILE_SIZE*2**(levels - 1) < max(columns, rows)*TILE_CELL_PIXELS:
+		levels += 1
+	return levels
+
+# the (across, down) count of tiles at zoom level z
+def tile_count(columns, rows, z):
+	side = max(columns, rows)
+	return -(-columns*2**z//side), -(-rows*2**z//side)
+
+def tile_cells(cells, background, z, tx, ty):
+	"""Renders the tile at column tx and row ty of zoom level z, anchored to the top left of the maze.
+	Only the tile's own window is read from the cells, each pixel takes the cell under its center
+	and pixels past the maze's edge take the background index."""
+	rows, columns = cells.shape
+	scale = TILE_SIZE*2**z/max(rows, columns) # pixels per cell
+	pixels = np.arange(TILE_SIZE) + 0.5
+	column = np.floor((tx*TILE_SIZE + pixels)/scale).astype(np.intp)
+	row = np.floor((ty*TILE_SIZE + pixels)/scale).astype(np.intp)
+	tile = cells[np.minimum(row, rows - 1)[:, None], np.minimum(column, columns - 1)[None, :]]
+	tile[row >= rows, :] = background
+	tile[:, column >= columns] = background
+	return tile
+
+# maps palette indexes to the ascii codes of their symbols
+def symbol_table(symbols):
+	return np.frombuffer(''.join(symbols).encode('ascii'), dtype=np.uint8)
+
+def render_text(cells, table):
+	"""Renders a 2D array of palette indexes as lines of symbols, in one pass through the table."""
+	height, width = cells.shape
+	lines = np.empty((height, width + 1), dtype=np.uint8)
+	lines[:, :width] = table[cells]
+	lines[:, width] = ord('\n')
+	return lines.tobytes().decode('ascii')
+
+def text_rows(cells, table):
+	"""Yields the lines of render_text one row at a time, so only a single row is held at once.
+	The cells can be any iterable of rows, such as a generator making them as they are asked for."""
+	newline = b'\n'
+	for row in cells:
+		yield (table[row].tobytes() + newline).decode('ascii')
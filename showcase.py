@@ -0,0 +1,72 @@
+"""
+	A rotating pool of ready made mazes for the welcome page. Each request
+	takes the next maze in the pool, and a maze is retired once it has been
+	shown a number of times, a background thread then builds a replacement
+	with a new seed so visitors keep seeing different mazes.
+"""
+import random
+import threading
+from collections import deque
+
+# Class for a bounded pool of prebuilt entries that are handed out in turn
+class ShowcasePool:
+	def __init__(self, build, size = 8, uses = 50):
+		if type(size) != int or size < 1:
+			raise BaseException('ShowcasePool() - The input "size" must be an int of at least 1.')
+		if type(uses) != int or uses < 1:
+			raise BaseException('ShowcasePool() - The input "uses" must be an int of at least 1.')
+		self.build = build # called with a seed, returns the entry to show
+		self.size = size
+		self.uses = uses
+		self.slots = deque() # [entry, times it can still be shown]
+		self.lock = threading.Lock()
+		self.wanted = threading.Event()
+		self.thread = None
+		self.built = 0
+
+	# builds one entry with a fresh seed and adds it to the pool, returning its slot
+	def add(self):
+		slot = [self.build(random.getrandbits(32)), self.uses]
+		with self.lock:
+			self.built += 1
+			if len(self.slots) < self.size:
+				self.slots.append(slot)
+		return slot
+
+	def fill(self):
+		"""Builds entries until the pool is full, without starting the background thread."""
+		while len(self.slots) < self.size:
+			self.add()
+
+	def refill(self):
+		while True:
+			self.wanted.wait()
+			self.wanted.clear()
+			self.fill()
+
+	# the refill thread is only started by the first request, so every forked worker starts its own
+	def wake(self):
+		with self.lock:
+			if self.thread is None:
+				self.thread = threading.Thread(target=self.refill, daemon=True)
+				self.thread.start()
+		self.wanted.set()
+
+	def take(self):
+		"""The next entry to show, only built on the spot when every entry has been retired and none are ready yet."""
+		with self.lock:
+			slot = self.slots.popleft() if self.slots else None
+			if slot is not None:
+				slot[1] -= 1
+				if slot[1] > 0:
+					self.slots.append(slot)
+			short = len(self.slots) < self.size
+		if short:
+			self.wake()
+		if slot is None:
+			slot = self.add()
+		return slot[0]
+
+	def stats(self):
+		with self.lock:
+			return {'entries': len(self.slots), 'built': self.built}
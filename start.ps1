@@ -7,7 +7,7 @@ else{
     Write-Output "Virtual Environment not found, creating and installing dependencies..."
     python -m venv forgeon_env
     .\forgeon_env\Scripts\Activate.ps1
-    python -m pip install flask flask-sqlalchemy flask-login gevent matplotlib
+    python -m pip install flask flask-sqlalchemy flask-login gevent matplotlib numpy
 }
 
 python main.py
\ No newline at end of file
@@ -1,6 +1,27 @@
-from grid import Grid, Room, colorToString
+from grid import Grid, Room, colorToString, streamRows, PALETTE, SEED_LIMIT, TEXT_TABLE, WALL, FLOOR
+from cache import LRUCache
+from database import ConnectionPool, migrate, MIGRATIONS
+from flask import Flask
+import database
+from forge import generate_image, grab_map, parse_maze_args
+from jobs import JobQueue
+from metrics import Histogram
+from paths import carve_blocks, carve_passages, connect_regions, label_runs
+from render import encode_png, encode_png_rows, render_text, scale_cells, text_rows, tile_cells, tile_count, tile_levels
+from showcase import ShowcasePool
+from MazeRoomDescr import ROOM_TYPES, generate_room_descriptions, format_sentence, describe_room, description_cache
 from math import ceil
+import numpy as np
+import os
 import random
+import re
+import sqlite3
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
 
 # Helper function to print and run test cases with debugging output
 def run_test(test_func):
@@ -123,48 +144,54 @@ def test_displayGraph():
 def text_displayImage():
     """Verifies that the image display function returns the correct value."""
     sampleGrid = Grid(3,3)
-    # pyramid shape because why not
-    grid_image_text = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAA"\
-       "oAAAAHgCAYAAAA10dzkAAAAOnRFWHRTb2Z0d2FyZQBNYXRwbG90bGliIHZlcnNpb"\
-       "24zLjEwLjAsIGh0dHBzOi8vbWF0cGxvdGxpYi5vcmcvlHJYcgAAAAlwSFlzAAAPYQ"\
-       "AAD2EBqD+naQAACPRJREFUeJzt2LGNw1AMBUHzcH2o/7JUCd2DFHwYO5MTeOGCs7v7"\
-       "4bGZOT0BAHLkyzt/L+8BAPgxAhAAIEYAAgDECEAAgBgBCAAQIwABAGIEIABAjAAEAIg"\
-       "RgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAADECEAAgRgACAMQ"\
-       "IQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAAQIwABAGIE"\
-       "IABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAADECEA"\
-       "AgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAAQI"\
-       "wABAGIEIABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAA"\
-       "DECEAAgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCA"\
-       "AQIwABAGIEIABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAA"\
-       "ADECEAAgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAA"\
-       "QIwABAGIEIABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAADE"\
-       "CEAAgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAAQIwAB"\
-       "AGIEIABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAADECEAAgRg"\
-       "ACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAAQIwABAGIEIABAj"\
-       "AAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQMz/6QHAc/d9n55A2HVdpycAD/kAAgDEC"\
-       "EAAgBgBCAAQIwABAGIEIABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEY"\
-       "AAADECEAAgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAAQIwAB"\
-       "AGIEIABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAADECEAAgRgACAMQ"\
-       "IQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAAQIwABAGIEIABAjAAEAIgRgAA"\
-       "AMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAADECEAAgRgACAMQIQACAGAEIABAjAAEAYgQg"\
-       "AECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAAQIwABAGIEIABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQ"\
-       "gAECMAAQBiBCAAQIwABACIEYAAADECEAAgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAA"\
-       "gDECEAAgBgBCAAQIwABAGIEIABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAA"\
-       "DECEAAgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAAQIwABAGIEIABAjA"\
-       "AEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAADECEAAgRgACAMQIQACAGAEIABAjAAEA"\
-       "YgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAAQIwABAGIEIABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQg"\
-       "AECMAAQBiBCAAQIwABACIEYAAADGzu3t6xC+bmdMTACBHvrzjAwgAECMAAQBiBCAAQIwABACIEYAAADECEAAgRgACAMQ"\
-       "IQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAAQIwABAGIEIABAjAAEAIgRgAAAMQIQACBG"\
-       "AAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAADECEAAgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAh"\
-       "AAIEYAAgDECEAAgBgBCAAQIwABAGIEIABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAA"\
-       "DECEAAgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAAQIwABAGIEIABAjAAEAIgRg"\
-       "AAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAADECEAAgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiB"\
-       "GAAAAxAhAAIEYAAgDECEAAgBgBCAAQIwABAGIEIABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACI"\
-       "EYAAADECEAAgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgDECEAAgBgBCAAQIwABAGIEIABAjAAEAIg"\
-       "RgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAAADECEAAgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBG"\
-       "AAAAxAhAAIEYAAgDECEAAgBgBCAAQIwABAGIEIABAjAAEAIgRgAAAMQIQACBGAAIAxAhAAIAYAQgAECMAAQBiBCAAQIwABACIEYAA"\
-       "ADECEAAgRgACAMQIQACAGAEIABAjAAEAYgQgAECMAAQAiBGAAAAxAhAAIEYAAgB8Wr4aBBS5PVFClAAAAABJRU5ErkJggg=="
-    
+    grid_image_text = "data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAoAAAAHgCAMAAAACDyzWAAAAJ1BMVEUAAADh4eFQUFD/1wD/jAAekP"\
+       "//abTAwMCLRRMAZAAA//+KK+L///9A00cIAAANVElEQVR4nO3SsQ0DQBACQTt3//W6BJKR7oWYAgjQfn7YZ6rxXvjgVOO98MGpxn"\
+       "vhg1ON98IHpxrvhQ9ONd4LH5xqvBc+ONV4L3xwqvFe+OBU473wwanGe+GDU433wgenGu+FD0413gsfnGq8Fz441XgvfHCq8V744F"\
+       "TjvfDBqcZ74YNTjffCB6ca74UPTjXeCx+carwXPjjVeC98cKrxXvjgVOO98MGpxnvhg1ON98IHpxrvhQ9ONd4LH5xqvBc+ONV4L3"\
+       "xwqvFe+OBU473wwanGe+GDU433wgenGu+FD0413gsfnGq8Fz441XgvfHCq8V744FTjvfDBqcZ74YNTjffCB6ca74UPTjXeCx+car"\
+       "wXPjjVeC98cKrxXvjgVOO98MGpxnvhg1ON98IHpxrvhQ9ONd4LH5xqvBc+ONV4L3xwqvFe+OBU473wwanGe+GDU433wgenGu+FD0"\
+       "413gsfnGq8Fz441XgvfHCq8V744FTjvfDBqcZ74YNTjffCB6ca74UPTjXeCx+carwXPjjVeC98cKrxXvjgVOO98MGpxnvhg1ON98"\
+       "IHpxrvhQ9ONd4LH5xqvBc+ONV4L3xwqvFe+OBU473wwanGe+GDU433wgenGu+FD0413gsfnGq8Fz441XgvfHCq8V744FTjvfDBqc"\
+       "Z74YNTjffCB6ca74UPTjXeCx+carwXPjjVeC98cKrxXvjgVOO98MGpxnvhg1ON98IHpxrvhQ9ONd4LH5xqvBc+ONV4L3xwqvFe+O"\
+       "BU473wwanGe+GDU433wgenGu+FD0413gsfnGq8Fz441XgvfHCq8V744FTjvfDBqcZ74YNTjffCB6ca74UPTjXeCx+carwXPjjVeC"\
+       "98cKrxXvjgVOO98MGpxnvhg1ON98IHpxrvhQ9ONd4LH5xqvBc+ONV4L3xwqvFe+OBU473wwanGe+GDU433wgenGu+FD0413gsfnG"\
+       "q8Fz441XgvfHCq8V744FTjvfDBqcZ74YNTjffCB6ca74UPTjXeCx+carwXPjjVeC98cKrxXvjgVOO98MGpxnvhg1ON98IHpxrvhQ"\
+       "9ONd4LH5xqvBc+ONV4L3xwqvFe+OBU473wwanGe+GDU433wgenGu+FD0413gsfnGq8Fz441XgvfPBx38dd/5PwXvjg464DS67/SX"\
+       "gvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5"\
+       "PwXvjg464DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf"\
+       "4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWH"\
+       "L9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOr"\
+       "Dk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983H"\
+       "VgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/8kvBc++L"\
+       "jrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfP"\
+       "Bx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXv"\
+       "jg464DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b"\
+       "3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8"\
+       "J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p"\
+       "+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyf"\
+       "U/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/8kvBc++LjrwJ"\
+       "LrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14"\
+       "El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg46"\
+       "4DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwc"\
+       "ddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74Y"\
+       "OPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98"\
+       "IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce"\
+       "+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/8kvBc++LjrwJLrfx"\
+       "LeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS67/SXgvfPBx14El1/"\
+       "8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwcddB5Zc/5PwXvjg464DS6"\
+       "7/SXgvfPBx14El1/8kvBc++LjrwJLrfxLeCx983HVgyfU/Ce+FDz7uOrDk+p+E98IHH3cdWHL9T8J74YOPuw4suf4n4b3wwanGe+"\
+       "GDU433wgenGu+FD0413gsfnGq8Fz441XgvfHCq8V744FTjvfDBqcZ74YNTjffCB6ca74UPTjXeCx+carwXPjjVeC98cKrxXvjgVO"\
+       "O98MGpxnvhg1ON98IHpxrvhQ9ONd4LH5xqvBc+ONV4L3xwqvFe+OBU473wwanGe+GDU433wgenGu+FD0413gsfnGq8Fz441XgvfH"\
+       "Cq8V744FTjvfDBqcZ74YNTjffCB6ca74UPTjXeCx+carwXPjjVeC98cKrxXvjgVOO98MGpxnvhg1ON98IHpxrvhQ9ONd4LH5xqvB"\
+       "c+ONV4L3xwqvFe+OBU473wwanGe+GDU433wgenGu+FD0413gsfnGq8Fz441XgvfHCq8V744FTjvfDBqcZ74YNTjffCB6ca74UPTj"\
+       "XeCx+carwXPjjVeC98cKrxXvjgVOO98MGpxnvhg1ON98IHpxrvhQ9ONd4LH5xqvBc+ONV4L3xwqvFe+OBU473wwanGe+GDU433wg"\
+       "enGu+FD0413gsfnGq8Fz441XgvfHCq8V744FTjvfDBqcZ74YNTjffCB6ca74UPTjXeCx+carwXPjjVeC98cKrxXvjgVOO98MGpxn"\
+       "vhg1ON98IHpxrvhQ9ONd4LH5xqvBc+ONV4L3xwqvFe+OBU473wwanGe+GDU433wgenGu+FD0413gsfnGq8Fz441XgvfHCq8V744F"\
+       "TjvfDBqcZ74YNTjffCB6ca74UPTjXeCx+carwXPjjVeC98cKrxXvjgVOO98MGpxnvhg1ON98IHpxrvhQ9ONd4LH5xqvBc+ONV4L3"\
+       "xwqvFe+OBU473wwanGe+GDU433wgenGu+FD0413gsfnGq8Fz441XgvfHCq8V744FTjvfDBqcZ74YNTjffCB6ca74UPTjXeCx+car"\
+       "wXPjjVeC98cKrxXvjgVOO98MGpxnvhg1ON98IHpxrvhQ9ONd4LH5xqvBc+ONV4L3xwqvFe+OBU473wwanGe+GDU433wgenGu+FD0"\
+       "413gsfnGq8Fz441XgvfHCq8V744FTjvfDBqcZ74YNTjffCB6ca74UPTjXeCx+carwXPjjVeC98cKrxXvjgVNO9/AF5UnTTsoO96g"\
+       "AAAABJRU5ErkJggg=="
     
     print("\tChecking the image output to ensure it matches the actual...")
     assert sampleGrid.displayGrid() == grid_image_text, "Image function result does not match the actual."
@@ -244,29 +271,473 @@ def test_gridToImageLocation_invalid():
 # Test Case 15: Generating the path
 def test_generatePath():
 	"""Checks that the path generated is consistent"""
-	sampleGrid = Grid(15,15)
-	random.seed(1)
+	sampleGrid = Grid(15,15,1)
 	sampleGrid.generatePath()
 	expected = [
 		# Causes lag for some IDEs
 		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0)], 
 		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0)], 
 		[(0, 0, 0), (0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (225, 225, 225), (225, 225, 225), (0, 0, 0)], 
-		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0)], 
-		[(0, 0, 0), (225, 225, 225), (225, 225, 225), (0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
-		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (225, 225, 225), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
-		[(0, 0, 0), (0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
-		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (225, 225, 225), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
+		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
+		[(0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
+		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
+		[(0, 0, 0), (0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
+		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
 		[(0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
-		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
+		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
 		[(0, 0, 0), (0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
-		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (225, 225, 225), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0), (225, 225, 225), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
-		[(0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
-		[(0, 0, 0), (225, 225, 225), (225, 225, 225), (0, 0, 0), (0, 0, 0), (225, 225, 225), (225, 225, 225), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0)], 
+		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
+		[(0, 0, 0), (0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (225, 225, 225), (0, 0, 0), (225, 225, 225), (225, 225, 225), (225, 225, 225), (0, 0, 0), (0, 0, 0)], 
+		[(0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0), (0, 0, 0), (225, 225, 225), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0)], 
 		[(0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0), (0, 0, 0)]
 	]
 	assert sampleGrid.grid == expected, "Path generated does not match the expected."
 	
+# Test Case 16: Palette-indexed cell storage
+def test_paletteStorage():
+    """Ensures cells are stored as palette indexes and the grid view writes through to them."""
+    sampleGrid = Grid(5, 5)
+    print(f"\tChecking cell storage: Expected uint8, Got {sampleGrid.cells.dtype}")
+    assert sampleGrid.cells.dtype == 'uint8', "Cells should be stored as uint8 palette indexes."
+    assert sampleGrid.cells[0][0] == WALL and sampleGrid.cells[1][1] == FLOOR, "Border and inner cells have the wrong kind."
+
+    print("\tWriting a new color through grid.grid[2][3]...")
+    sampleGrid.grid[2][3] = (12, 34, 56)
+    assert sampleGrid.grid[2][3] == (12, 34, 56), "Color written through the view was not read back."
+    assert sampleGrid.palette[sampleGrid.cells[2][3]] == (12, 34, 56), "Color was not added to the palette."
+
+# Test Case 17: Carving large grids without recursion
+def test_carveLargeGrid():
+    """Checks that carving a grid far deeper than the recursion limit completes."""
+    x, y = 601, 601
+    print(f"\tCarving a {x}x{y} grid with a recursion limit of {sys.getrecursionlimit()}...")
+    sampleGrid = Grid(x, y, 1)
+    sampleGrid.generatePath()
+    assert sampleGrid.cells.shape == (y, x), "Carving changed the grid dimensions."
+    assert (sampleGrid.cells[1:-1, 1:-1] == WALL).any(), "No passages were carved."
+
+# Test Case 18: Validate Scaled Image Display
+def test_displayScaledImage():
+    """Checks that a scaled image is a palette png with every cell drawn as a square block."""
+    sampleGrid = Grid(4, 3)
+    pngImage = sampleGrid.image(scale=5, raw=True)
+    print(f"\tChecking png signature and header, Got {pngImage[:8]}")
+    assert pngImage[:8] == b'\x89PNG\r\n\x1a\n', "Image is not a png."
+    width, height = int.from_bytes(pngImage[16:20], 'big'), int.from_bytes(pngImage[20:24], 'big')
+    print(f"\tChecking image size: Expected (20, 15), Got ({width}, {height})")
+    assert (width, height) == (20, 15), "Scaled image has the wrong size."
+    assert pngImage[25] == 3, "Image should use a palette."
+
+# Test Case 19: Least recently used maze cache
+def test_lruCache():
+    """Ensures the cache evicts the least recently used entry and counts hits and misses."""
+    cache = LRUCache(max_entries=2, max_bytes=100)
+    cache.put('a', 1, 10)
+    cache.put('b', 2, 10)
+    print("\tReading 'a' so that 'b' becomes the least recently used...")
+    assert cache.get('a') == 1, "Cached value was not returned."
+    cache.put('c', 3, 10)
+    assert 'b' not in cache and 'a' in cache and 'c' in cache, "The wrong entry was evicted."
+
+    print("\tAdding an entry over the byte budget...")
+    cache.put('d', 4, 95)
+    assert cache.size <= 100 and 'd' in cache, "Byte budget was not enforced."
+    assert cache.get('b') is None, "Evicted entry should miss."
+    print(f"\tChecking counters, Got {cache.stats()}")
+    assert (cache.hits, cache.misses) == (1, 1), "Hit and miss counters are incorrect."
+
+# Test Case 20: Grids draw from their own random generator
+def test_isolatedRandom():
+    """Checks that generation is unaffected by other users of the random module."""
+    first, second = Grid(25, 25, 7), Grid(25, 25, 7)
+    first.generateRooms(4)
+    print("\tReseeding the global random module between generating two grids with the same seed...")
+    random.seed(12345)
+    second.generateRooms(4)
+    random.random()
+    first.generatePath()
+    second.generatePath()
+    assert first.grid == second.grid, "Grids with the same seed generated different mazes."
+
+# Test Case 21: Stage timing histogram
+def test_histogram():
+    """Ensures observed timings land in cumulative buckets of the Prometheus text format."""
+    histogram = Histogram('test_seconds', 'Test timings.', 'stage', buckets=(0.1, 1))
+    for amount in (0.05, 0.5, 0.5, 5):
+        histogram.observe('carve', amount)
+    lines = list(histogram.lines())
+    print(f"\tChecking exposition lines, Got {lines[2:]}")
+    expected = [
+        'test_seconds_bucket{stage="carve",le="0.1"} 1',
+        'test_seconds_bucket{stage="carve",le="1"} 3',
+        'test_seconds_bucket{stage="carve",le="+Inf"} 4',
+        'test_seconds_sum{stage="carve"} 6.05',
+        'test_seconds_count{stage="carve"} 4',
+    ]
+    assert lines[2:] == expected, "Histogram lines do not match the expected."
+
+# Test Case 22: Rooms never overlap and placement stops when space runs out
+def test_roomOccupancy():
+    """Ensures placed rooms keep their gap, and that a full grid ends placement with a report."""
+    sampleGrid = Grid(60, 60, 3)
+    print("\tPlacing 40 rooms with a gap of 1...")
+    report = sampleGrid.generateRooms(40, max_room_size=6, min_gap=1)
+    print(f"\tChecking the placement report, Got {report}")
+    assert report['placed'] == len(sampleGrid.rooms), "Report does not match the placed rooms."
+    for i, ((x1, y1), (x2, y2), _) in enumerate(sampleGrid.rooms):
+        for (ox1, oy1), (ox2, oy2), _ in sampleGrid.rooms[i + 1:]:
+            assert x2 < ox1 or ox2 < x1 or y2 < oy1 or oy2 < y1, "Rooms overlap or touch."
+    crowded = Grid(12, 12, 3)
+    report = crowded.generateRooms(100, max_room_size=5)
+    print(f"\tChecking a crowded grid stops early, Got {report}")
+    assert report['exhausted'] and report['placed'] < 100, "Placement did not stop on a full grid."
+    filled = Grid(60, 60, 3).generateRooms(100, max_room_size=6, fill_ratio=0.1)
+    assert filled['target_reached'] and filled['fill'] >= 0.1, "Placement did not stop at the fill ratio."
+
+# Test Case 23: Joining disconnected regions
+def test_connectRegions():
+    """Checks that every open region is joined, through single walls or a longer run of them."""
+    rows = ['########', '#..#####', '#..#..##', '########', '######.#', '########']
+    cells = [WALL if c == '#' else FLOOR for row in rows for c in row]
+    print("\tJoining three regions, one of them only reachable through two walls...")
+    report = connect_regions(cells, 8, 6, random.Random(1), WALL, FLOOR)
+    print(f"\tChecking the report, Got {report}")
+    assert report['regions'] == 3 and report['repaired'] == 2, "Regions were not all joined."
+    assert report['walls_broken'] == cells.count(FLOOR) - 7, "Report does not count the opened walls."
+    sampleGrid = Grid(120, 90, 4)
+    sampleGrid.generateRooms(10, max_room_size=9)
+    sampleGrid.generatePath()
+    print(f"\tChecking a generated maze, Got {sampleGrid.connectivity}")
+    assert label_runs(sampleGrid.cells.ravel().tolist(), 120, 90, WALL)[2] == 1, "Generated maze has disconnected regions."
+
+# Test Case 24: Room descriptions from compiled templates
+def test_roomDescriptions():
+    """Ensures batches of descriptions are reproducible and come out already formatted."""
+    print("\tGenerating 500 descriptions twice from the same seed...")
+    descriptions = generate_room_descriptions(500, random.Random(3))
+    assert descriptions == generate_room_descriptions(500, random.Random(3)), "Same seed gave different descriptions."
+    for description in descriptions:
+        assert description == format_sentence(description), f"Description was not formatted: {description}"
+        assert not re.search(r"\b[aA] [aeiouAEIOU]|\b[aA]n [^aeiouAEIOU]", description), f"Wrong article in: {description}"
+    print(f"\tChecking a sample, Got {descriptions[0]}")
+
+# Test Case 25: Room descriptions depend only on the maze and room
+def test_describeRoom():
+    """Checks that a room's description is fixed by its seed, index and type, and is cached."""
+    print("\tDescribing the same room with the global random module reseeded in between...")
+    random.seed(1)
+    first = describe_room(42, 3, "Armory")
+    random.seed(2)
+    assert describe_room(42, 3, "Armory") == first, "Description changed between views."
+    assert description_cache.hits >= 1, "Second view was not read from the cache."
+    description_cache.clear()
+    assert describe_room(42, 3, "Armory") == first, "Regenerated description does not match."
+    print(f"\tChecking other rooms differ, Got {describe_room(42, 4, 'Armory')}")
+    assert describe_room(42, 4, "Armory") != first or describe_room(43, 3, "Armory") != first, "Rooms share one description."
+
+# Test Case 26: Room records carry their room type
+def test_roomRecords():
+    """Ensures generated rooms know their type and still unpack as [topleft, bottomright, color]."""
+    sampleGrid = Grid(40, 40, 5)
+    sampleGrid.generateRooms(6, max_room_size=6)
+    names = list(ROOM_TYPES)
+    for room in sampleGrid.rooms:
+        topleft, bottomright, color = room
+        assert ROOM_TYPES[names[room.type_id]]['rgb'] == color, "Room type does not match its color."
+        assert bottomright == (room.x + room.width, room.y + room.height), "Room unpacked to the wrong corners."
+    print(f"\tChecking types found by grab_map, Got {[name for _, name, _ in grab_map(sampleGrid)]}")
+    assert [name for _, name, _ in grab_map(sampleGrid)] == [names[room.type_id] for room in sampleGrid.rooms], "grab_map found the wrong room types."
+    assert Room(1, 1, 2, 2, (1, 2, 3)).type_id is None, "A plain color should not have a room type."
+    try:
+        Room(1, 1, 2, 2).size = 4
+        assert False, "Rooms should not take attributes outside their slots."
+    except AttributeError:
+        pass
+
+# Test Case 27: Text of non-square grids and room symbols
+def test_textRows():
+    """Checks that text covers every column of a wide grid, and that room symbols and row streaming match."""
+    sampleGrid = Grid(6, 3)
+    print(f"\tChecking a 6x3 grid, Got {sampleGrid.text()!r}")
+    assert sampleGrid.text() == "######\n#....#\n######\n", "Text of a wide grid is wrong."
+    sampleGrid = Grid(30, 20, 2)
+    sampleGrid.generateRooms(4, max_room_size=5)
+    sampleGrid.generatePath()
+    assert "".join(sampleGrid.textRows()) == sampleGrid.text(), "Streamed rows do not match the text."
+    text = sampleGrid.text(rooms=True).split("\n")
+    for room in sampleGrid.rooms:
+        symbol = ROOM_TYPES[list(ROOM_TYPES)[room.type_id]]['symbol']
+        assert text[room.y][room.x] == symbol, "Room is not drawn with its symbol."
+
+# Test Case 28: Binary serialization
+def test_serialize():
+    """Ensures a serialized grid loads back identical, and that damaged data is rejected."""
+    sampleGrid = Grid(45, 31, 8)
+    sampleGrid.generateRooms(6, max_room_size=6)
+    sampleGrid.generatePath()
+    data = sampleGrid.serialize()
+    print(f"\tSerialized a 45x31 grid into {len(data)} bytes...")
+    loaded = Grid.deserialize(data)
+    assert (loaded.cells == sampleGrid.cells).all() and loaded.grid == sampleGrid.grid, "Loaded cells do not match."
+    assert [list(room) for room in loaded.rooms] == [list(room) for room in sampleGrid.rooms], "Loaded rooms do not match."
+    assert [room.type_id for room in loaded.rooms] == [room.type_id for room in sampleGrid.rooms], "Loaded room types do not match."
+    assert loaded.seed == 8 and loaded.serialize() == data, "Loaded grid does not serialize the same."
+    print("\tChecking that a flipped byte is rejected...")
+    damaged = bytearray(data)
+    damaged[len(data) // 2] ^= 1
+    rejected = False
+    try:
+        Grid.deserialize(damaged)
+    except BaseException as e:
+        rejected = 'corrupted' in str(e)
+    assert rejected, "Damaged data was not rejected."
+    print("\tChecking that a seed too large to store is rejected...")
+    rejected = False
+    try:
+        Grid(10, 10, SEED_LIMIT).serialize()
+    except BaseException as e:
+        rejected = 'SEED_LIMIT' in str(e)
+    assert rejected, "A seed too large to store was serialized."
+
+# Test Case 29: Migrating the maze database
+def test_migrations():
+    """Checks that an old Maze table is migrated to keyed rows and that pooled connections are reused."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'mazes.db')
+        old = sqlite3.connect(path)
+        old.execute("CREATE TABLE Maze (maze_id BIGINT, user varchar(255), name varchar(255), x INT, y INT, seed INT, args varchar(512))")
+        old.execute("INSERT INTO Maze VALUES (1, 'ada', 'first', 30, 30, 5, '')")
+        old.commit()
+        old.close()
+        pool = ConnectionPool(path, size=2)
+        connection = pool.acquire()
+        print("\tMigrating a database made before migrations...")
+        assert migrate(connection) == len(MIGRATIONS), "Migration did not reach the latest version."
+        assert connection.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS), "user_version was not updated."
+        rows = connection.execute("SELECT id, position, user, name, grid FROM Maze").fetchall()
+        print(f"\tChecking the migrated rows, Got {rows}")
+        assert rows == [(1, 1, 'ada', 'first', None)], "Rows were not carried over."
+        plan = connection.execute("EXPLAIN QUERY PLAN SELECT id FROM Maze WHERE user = ? ORDER BY position", ('ada',)).fetchall()
+        assert 'maze_user_position' in str(plan), "Listing a user's mazes does not use the index."
+        assert migrate(connection) == len(MIGRATIONS), "Migrating twice failed."
+        pool.release(connection)
+        assert pool.acquire() is connection, "Released connection was not reused."
+        pool.release(connection)
+        pool.close()
+
+# Test Case 30: Deleting saved mazes keeps the other ids
+def test_deleteMazes():
+    """Ensures single and bulk deletes only remove the chosen mazes, leaving the other ids and order alone."""
+    previous = database.pool
+    with tempfile.TemporaryDirectory() as directory:
+        app = Flask('test')
+        # init_app points the shared pool at the temporary database, the app's own is put back afterwards
+        database.init_app(app, os.path.join(directory, 'mazes.db'))
+        try:
+            with app.app_context():
+                ids = [database.save_maze('ada', f'maze {i}', 30, 30, i, '', None) for i in range(1200)]
+                database.save_maze('bob', 'other', 30, 30, 1, '', None)
+                print("\tDeleting one maze, then 1000 at once...")
+                assert database.delete_mazes('ada', [ids[0]]) == 1, "Single delete removed the wrong number of mazes."
+                assert database.delete_mazes('ada', ids[100:1100] + [ids[-1] + 1]) == 1000, "Bulk delete removed the wrong number of mazes."
+                kept = [row[0] for row in database.user_mazes('ada')]
+                print(f"\tChecking the kept mazes, Got {len(kept)}")
+                assert kept == ids[1:100] + ids[1100:], "Kept mazes changed id or order."
+                assert database.delete_mazes('bob', ids) == 0 and len(database.user_mazes('bob')) == 1, "Another user's mazes were touched."
+        finally:
+            database.pool.close()
+            database.pool = previous
+
+# Test Case 31: Building mazes in the job queue
+def test_jobQueue():
+    """Checks that a job builds the same maze as generating it inline, and that bad jobs fail instead of hanging."""
+    queue = JobQueue(workers=1)
+    job = queue.submit(40, 30, 6, "rnum=4")
+    bad = queue.submit(40, 30, 6, "rnum=4000")
+    assert queue.submit(40, 30, 6, "rnum=4") is job, "The same maze was queued twice."
+    print("\tWaiting for the jobs to finish...")
+    for _ in range(600):
+        if job.stage in ('done', 'failed') and bad.stage in ('done', 'failed'):
+            break
+        time.sleep(0.05)
+    print("\tChecking that a late stage report does not move a finished job back...")
+    queue.progress.put((job.id, 'rendering'))
+    time.sleep(0.2)
+    queue.shutdown()
+    print(f"\tChecking the finished jobs, Got {job.status()} and {bad.status()}")
+    assert job.stage == 'done' and bad.stage == 'failed', "Jobs did not finish in the expected stages."
+    expected = generate_image(40, 30, 6, room_num=4)
+    assert (Grid.deserialize(job.result['grid']).cells == expected.cells).all(), "Job built a different maze."
+    assert job.result['maze'] == grab_map(expected), "Job described different rooms."
+
+# Test Case 32: Import time of the app
+IMPORT_BUDGET = 1.5 # seconds, best of three cold imports
+def test_importBudget():
+    """Checks that importing app stays within its time budget and does not load matplotlib."""
+    package = os.path.dirname(os.path.abspath(__file__))
+    script = "import sys, time; start = time.perf_counter(); import app; print(time.perf_counter() - start, 'matplotlib' in sys.modules)"
+    timings = []
+    # run from an empty directory so the databases made on import are thrown away
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(3):
+            output = subprocess.run([sys.executable, "-c", script], cwd=directory, capture_output=True, text=True, check=True,
+                env={**os.environ, "PYTHONPATH": package}).stdout.split()
+            timings.append(float(output[0]))
+            assert output[1] == 'False', "Importing app loaded matplotlib."
+    print(f"\tChecking the import time, Got {min(timings):.3f}s of {IMPORT_BUDGET}s")
+    assert min(timings) < IMPORT_BUDGET, f"Importing app took {min(timings):.3f}s, over its budget of {IMPORT_BUDGET}s."
+
+# Test Case 33: Rotating the showcase pool
+def test_showcasePool():
+    """Checks that the showcase pool hands out its mazes in turn and replaces the ones it retires."""
+    pool = ShowcasePool(lambda seed: seed, size=3, uses=2)
+    pool.fill()
+    first = [pool.take() for _ in range(3)]
+    print(f"\tChecking the first round, Got {first}")
+    assert len(set(first)) == 3, "Pool repeated a maze before showing all of them."
+    assert [pool.take() for _ in range(3)] == first, "Pool did not rotate through its mazes in order."
+    # every maze has now been shown twice and retired
+    for _ in range(100):
+        if pool.stats()['entries'] == 3:
+            break
+        time.sleep(0.01)
+    print(f"\tChecking the refilled pool, Got {pool.stats()}")
+    assert pool.stats() == {'entries': 3, 'built': 6}, "Pool was not refilled after retiring its mazes."
+    assert not set(pool.take() for _ in range(3)) & set(first), "Pool showed a retired maze."
+
+# Test Case 34: Rendering tiles
+def test_tiles():
+    """Checks that the tile pyramid covers the grid exactly and that tiles outside it are refused."""
+    sampleGrid = generate_image(60, 40, 12, room_num=4)
+    levels = tile_levels(60, 40)
+    print(f"\tChecking the zoom levels of a 60x40 grid, Got {levels} and {[tile_count(60, 40, z) for z in range(levels)]}")
+    assert levels == 3 and tile_count(60, 40, 0) == (1, 1) and tile_count(60, 40, 2) == (4, 3), "Wrong tile pyramid."
+    # at the deepest level 60 cells are 1024 pixels wide, so every 256 pixel tile is 15 cells and a bit
+    tiles = [[tile_cells(sampleGrid.cells, 255, 2, tx, ty) for tx in range(4)] for ty in range(3)]
+    whole = np.block(tiles)
+    print("\tChecking the deepest level against the scaled grid...")
+    scale = 1024/60
+    column = np.floor((np.arange(1024) + 0.5)/scale).astype(int)
+    row = np.floor((np.arange(768) + 0.5)/scale).astype(int)
+    assert (whole[:row.searchsorted(40), :] == sampleGrid.cells[row[row < 40]][:, column]).all(), "Tiles do not match the grid."
+    assert (whole[row >= 40, :] == 255).all(), "Tiles past the grid are not background."
+    assert sampleGrid.tile(0, 0, 0).startswith(b'\x89PNG'), "Tile is not a png."
+    for z, tx, ty in ((3, 0, 0), (2, 4, 0), (1, 0, 2), (-1, 0, 0)):
+        rejected = False
+        try:
+            sampleGrid.tile(z, tx, ty)
+        except BaseException:
+            rejected = True
+        assert rejected, f"Tile {z}/{tx}/{ty} is outside the pyramid but was rendered."
+
+# Test Case 35: Streaming a maze row by row
+def test_streamRows():
+    """Checks that streamed rows make a perfect maze and encode to the same png data as the whole grid."""
+    for x, y in ((3, 3), (16, 10), (41, 23)):
+        rows = list(streamRows(x, y, 8))
+        cells = np.array(rows)
+        print(f"\tChecking a streamed {x}x{y} maze, Got {cells.shape}")
+        assert cells.shape == (y, x), "Streamed the wrong number of rows or cells."
+        # passages are WALL as carve_passages makes them in a Grid, so the border, the passage lattice and the cells between match its carving
+        carved = Grid(x, y, 8)
+        flat = carved.cells.ravel().tolist()
+        flat[x + 1] = WALL # carve_passages leaves its start cell for a neighbour to fill, a 3x3 grid has none
+        carve_passages(flat, x, y, 1, 1, carved.rng, WALL)
+        carved.cells = np.array(flat, dtype=np.uint8).reshape(y, x)
+        for name, cell in (("border", (0, 0)), ("border", (-1, -1)), ("lattice", (slice(1, -1, 2), slice(1, -1, 2))), ("between", (slice(2, -1, 2), slice(2, -1, 2)))):
+            assert (cells[cell] == carved.cells[cell]).all(), f"Streamed {name} cells differ from a Grid of the same size."
+        assert (cells[0] == WALL).all() and (cells[-1] == WALL).all() and (cells[:, 0] == WALL).all() and (cells[:, -1] == WALL).all(), "Streamed border is not WALL."
+        # one region of passages, and one join less than there are passage cells, so there are no loops
+        passages = np.where(cells == WALL, FLOOR, WALL)
+        passages[0] = passages[-1] = passages[:, 0] = passages[:, -1] = WALL
+        regions = label_runs(passages.ravel().tolist(), x, y, WALL)[2]
+        nodes = len(range(1, x - 1, 2))*len(range(1, y - 1, 2))
+        assert regions == 1 and (passages == FLOOR).sum() == 2*nodes - 1, "Streamed maze is not a perfect maze."
+    assert [row.tolist() for row in streamRows(41, 23, 8)] == [row.tolist() for row in rows], "Same seed streamed a different maze."
+    assert ''.join(text_rows(iter(rows), TEXT_TABLE)) == render_text(cells, TEXT_TABLE), "Streamed text differs."
+
+    # the png's pixels are in its IDAT chunks, however they are split up
+    def pixels(png):
+        data, at = b'', 8
+        while at < len(png):
+            length, kind = struct.unpack('>I4s', png[at:at + 8])
+            if kind == b'IDAT':
+                data += png[at + 8:at + 8 + length]
+            at += length + 12
+        return zlib.decompress(data)
+    streamed = b''.join(encode_png_rows(iter(rows), 41, 23, PALETTE, 2))
+    print("\tChecking the streamed png against the whole grid's png...")
+    assert streamed[:8] == encode_png(cells, PALETTE)[:8], "Streamed png has the wrong signature."
+    assert pixels(streamed) == pixels(encode_png(scale_cells(cells, 2), PALETTE)), "Streamed png has different pixels."
+
+# Test Case 36: Carving in blocks
+def test_carveBlocks():
+    """Checks that carving in blocks makes one tree of passages, the same for any number of processes."""
+    for x, y, blocks in ((31, 21, 4), (32, 22, 6), (15, 15, 64)):
+        carved = []
+        for processes in (1, 2):
+            cells = Grid(x, y).cells
+            report = carve_blocks(cells, x, y, random.Random(3), WALL, blocks, processes)
+            carved.append(cells)
+        print(f"\tChecking a {x}x{y} grid carved in {blocks} blocks, Got {report}")
+        assert (carved[0] == carved[1]).all(), "Carving changed with the number of processes."
+        # the carved cells inside the border should be one region with no loops, like carve_passages makes
+        inside = carved[0] == WALL
+        inside[0, :] = inside[-1, :] = inside[:, 0] = inside[:, -1] = False
+        regions = label_runs(np.where(inside, FLOOR, WALL).ravel().tolist(), x, y, WALL)[2]
+        nodes = len(range(1, x - 1, 2))*len(range(1, y - 1, 2))
+        assert regions == 1 and inside.sum() == 2*nodes - 1, "Blocks were not stitched into one tree."
+        assert report['openings'] == report['blocks'] - 1, "Blocks were not stitched along a spanning tree."
+    sampleGrid = generate_image(101, 81, 5, room_num=6, blocks=4)
+    print(f"\tChecking a maze generated in blocks, Got {sampleGrid.connectivity}")
+    assert (sampleGrid.cells == generate_image(101, 81, 5, room_num=6, blocks=4).cells).all(), "Same seed and blocks made a different maze."
+    assert label_runs(sampleGrid.cells.ravel().tolist(), 101, 81, WALL)[2] == 1, "Maze generated in blocks is not connected."
+
+# Test Case 37: Parsing maze arguments
+def test_parseMazeArgs():
+    """Checks that maze arguments are parsed, and that malformed ones raise ValueError rather than anything else."""
+    print("\tParsing well formed arguments...")
+    assert parse_maze_args(30, 30, "") == {'room_num': 8}, "Empty arguments were not the defaults."
+    assert parse_maze_args(30, 30, "rf=3;rnum=4;") == {'room_num': 4, 'filter': 3}, "Arguments were parsed wrongly."
+    for args in ("rf", "rnum=", "rf=3;gap", "rnum=x"):
+        rejected = False
+        try:
+            parse_maze_args(30, 30, args)
+        except ValueError:
+            rejected = True
+        print(f"\tParsing \"{args}\", Got rejected={rejected}")
+        assert rejected, f"Malformed arguments \"{args}\" did not raise ValueError."
+
+# Test Case 38: Jobs shared between worker processes
+def test_sharedJobs():
+    """Checks that queues sharing a job table see each other's jobs, and that a maze one built is read back by the other."""
+    with tempfile.TemporaryDirectory() as directory:
+        # the tables get a pool of their own, the app's queue keeps using the app's database
+        pool = ConnectionPool(os.path.join(directory, 'mazes.db'), size=2)
+        connection = pool.acquire()
+        migrate(connection)
+        pool.release(connection)
+        first, second = JobQueue(workers=1, table=database.JobTable(pool)), JobQueue(workers=1, table=database.JobTable(pool))
+        try:
+            job = first.submit(40, 30, 6, "rnum=4")
+            print("\tSubmitting the same maze to the other queue while it builds...")
+            assert second.submit(40, 30, 6, "rnum=4").id == job.id, "The other queue built the same maze again."
+            for _ in range(600):
+                if job.stage in ('done', 'failed'):
+                    break
+                time.sleep(0.05)
+            first.shutdown()
+            shared = second.get(job.id)
+            print(f"\tReading the finished job from the other queue, Got {shared.status()}")
+            assert shared.stage == 'done' and shared.result['grid'] == job.result['grid'], "The other queue did not see the finished job."
+            built = second.submit(40, 30, 6, "rnum=4")
+            assert built.id == job.id and built.result['image'] == job.result['image'], "A built maze was not read back."
+            assert second.pool is None, "The other queue started building."
+        finally:
+            first.shutdown()
+            second.shutdown()
+            pool.close()
+
 # Run all tests
 test_cases = [
     test_makeGrid_valid,
@@ -284,6 +755,29 @@ test_cases = [
     test_gridToImageLocation_valid,
     test_gridToImageLocation_invalid,
     test_generatePath,
+    test_paletteStorage,
+    test_carveLargeGrid,
+    test_displayScaledImage,
+    test_lruCache,
+    test_isolatedRandom,
+    test_histogram,
+    test_roomOccupancy,
+    test_connectRegions,
+    test_roomDescriptions,
+    test_describeRoom,
+    test_roomRecords,
+    test_textRows,
+    test_serialize,
+    test_migrations,
+    test_deleteMazes,
+    test_jobQueue,
+    test_importBudget,
+    test_showcasePool,
+    test_tiles,
+    test_streamRows,
+    test_carveBlocks,
+    test_parseMazeArgs,
+    test_sharedJobs,
 ]
 
 print("Running tests...\n")